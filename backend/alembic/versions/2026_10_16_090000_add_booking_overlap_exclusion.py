@@ -0,0 +1,38 @@
+"""add booking overlap exclusion constraint
+
+Revision ID: 2026_10_16_090000
+Revises: 2025_04_04_164000
+Create Date: 2026-10-16 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_090000'
+down_revision = '2025_04_04_164000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # btree_gist permite combinar igualdade (boat_id) e sobreposição de intervalos no mesmo índice GiST
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    # Impede reservas ativas sobrepostas para a mesma embarcação.
+    # O índice GiST criado pela constraint também atende consultas por período.
+    # Reservas sobrepostas já existentes precisam ser canceladas antes desta migração.
+    op.execute("""
+        ALTER TABLE bookings
+        ADD CONSTRAINT bookings_no_overlap
+        EXCLUDE USING gist (
+            boat_id WITH =,
+            tsrange(start_date, end_date, '[)') WITH &&
+        )
+        WHERE (status IS DISTINCT FROM 'cancelled')
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE bookings DROP CONSTRAINT bookings_no_overlap")
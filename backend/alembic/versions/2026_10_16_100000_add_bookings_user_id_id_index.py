@@ -0,0 +1,25 @@
+"""add bookings (user_id, id) index for keyset pagination
+
+Revision ID: 2026_10_16_100000
+Revises: 2026_10_16_090000
+Create Date: 2026-10-16 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_100000'
+down_revision = '2026_10_16_090000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Listagem paginada das reservas de um usuário: WHERE user_id = ? AND id > ? ORDER BY id
+    op.create_index('ix_bookings_user_id_id', 'bookings', ['user_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_bookings_user_id_id', table_name='bookings')
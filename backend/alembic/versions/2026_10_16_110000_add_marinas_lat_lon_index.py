@@ -0,0 +1,25 @@
+"""add marinas (latitude, longitude) index
+
+Revision ID: 2026_10_16_110000
+Revises: 2026_10_16_100000
+Create Date: 2026-10-16 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_110000'
+down_revision = '2026_10_16_100000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Pré-filtro por bounding box em GET /api/marinas/nearby (fallback sem o índice em memória)
+    op.create_index('ix_marinas_latitude_longitude', 'marinas', ['latitude', 'longitude'])
+
+
+def downgrade():
+    op.drop_index('ix_marinas_latitude_longitude', table_name='marinas')
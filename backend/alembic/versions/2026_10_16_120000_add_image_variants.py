@@ -0,0 +1,27 @@
+"""add image_variants to boats and marinas
+
+Revision ID: 2026_10_16_120000
+Revises: 2026_10_16_110000
+Create Date: 2026-10-16 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_120000'
+down_revision = '2026_10_16_110000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # URLs das variantes (thumbnail, card, full) da imagem principal
+    op.add_column('boats', sa.Column('image_variants', sa.JSON(), nullable=True))
+    op.add_column('marinas', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('marinas', 'image_variants')
+    op.drop_column('boats', 'image_variants')
@@ -0,0 +1,59 @@
+"""store services and gallery_images as jsonb
+
+Revision ID: 2026_10_16_140000
+Revises: 2026_10_16_130000
+Create Date: 2026-10-16 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_140000'
+down_revision = '2026_10_16_130000'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ('marinas', 'services'),
+    ('marinas', 'gallery_images'),
+    ('boats', 'gallery_images'),
+)
+
+
+def upgrade():
+    # Conversão tolerante do texto legado: JSON válido é mantido, vazio vira NULL
+    # e qualquer outro valor vira uma lista de um elemento
+    op.execute("""
+        CREATE FUNCTION pg_temp.text_to_jsonb_array(value text) RETURNS jsonb AS $$
+        BEGIN
+            IF value IS NULL OR btrim(value) = '' THEN
+                RETURN NULL;
+            END IF;
+            BEGIN
+                RETURN CASE jsonb_typeof(value::jsonb)
+                    WHEN 'array' THEN value::jsonb
+                    ELSE jsonb_build_array(value::jsonb)
+                END;
+            EXCEPTION WHEN invalid_text_representation THEN
+                RETURN jsonb_build_array(value);
+            END;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table, column in COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb "
+            f"USING pg_temp.text_to_jsonb_array({column})"
+        )
+    op.execute("DROP FUNCTION pg_temp.text_to_jsonb_array(text)")
+
+    # Filtro de GET /api/marinas?services=...
+    op.create_index('ix_marinas_services', 'marinas', ['services'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_marinas_services', table_name='marinas')
+    for table, column in COLUMNS:
+        op.alter_column(table, column, type_=sa.String(), postgresql_using=f'{column}::text')
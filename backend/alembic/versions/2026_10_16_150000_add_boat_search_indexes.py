@@ -0,0 +1,34 @@
+"""add boat search indexes
+
+Revision ID: 2026_10_16_150000
+Revises: 2026_10_16_140000
+Create Date: 2026-10-16 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_150000'
+down_revision = '2026_10_16_140000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # GET /api/boats/search: índices parciais (apenas embarcações disponíveis) cobrindo
+    # a ordenação por preço/capacidade com o id como desempate da paginação por cursor
+    available = sa.text('is_available')
+    op.create_index('ix_boats_available_price', 'boats', ['price_per_day', 'id'], postgresql_where=available)
+    op.create_index('ix_boats_available_capacity', 'boats', ['capacity', 'id'], postgresql_where=available)
+    op.create_index('ix_boats_available_marina_price', 'boats', ['marina_id', 'price_per_day', 'id'], postgresql_where=available)
+    # Filtro por proprietário (também atende a FK boats.owner_id)
+    op.create_index('ix_boats_owner_id_id', 'boats', ['owner_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_boats_owner_id_id', table_name='boats')
+    op.drop_index('ix_boats_available_marina_price', table_name='boats')
+    op.drop_index('ix_boats_available_capacity', table_name='boats')
+    op.drop_index('ix_boats_available_price', table_name='boats')
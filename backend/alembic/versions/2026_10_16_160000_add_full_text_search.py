@@ -0,0 +1,65 @@
+"""add full-text search over boats and marinas
+
+Revision ID: 2026_10_16_160000
+Revises: 2026_10_16_150000
+Create Date: 2026-10-16 16:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_160000'
+down_revision = '2026_10_16_150000'
+branch_labels = None
+depends_on = None
+
+TABLES = ('boats', 'marinas')
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() é STABLE (depende do search_path); o wrapper com dicionário
+    # explícito pode ser IMMUTABLE e, portanto, usado em índices
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS $$
+            SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """)
+
+    # Documento de busca: nome com peso A, descrição com peso B
+    op.execute("""
+        CREATE OR REPLACE FUNCTION search_document(name text, description text) RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('portuguese', f_unaccent(coalesce(name, ''))), 'A')
+                || setweight(to_tsvector('portuguese', f_unaccent(coalesce(description, ''))), 'B')
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := search_document(NEW.name, NEW.description);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector")
+        op.execute(f"UPDATE {table} SET search_vector = search_document(name, description)")
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_update
+            BEFORE INSERT OR UPDATE OF name, description ON {table}
+            FOR EACH ROW EXECUTE FUNCTION search_vector_update()
+        """)
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.execute(f"DROP TRIGGER {table}_search_vector_update ON {table}")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+    op.execute("DROP FUNCTION search_vector_update()")
+    op.execute("DROP FUNCTION search_document(text, text)")
+    op.execute("DROP FUNCTION f_unaccent(text)")
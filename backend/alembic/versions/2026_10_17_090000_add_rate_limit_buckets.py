@@ -0,0 +1,32 @@
+"""add rate_limit_buckets table
+
+Revision ID: 2026_10_17_090000
+Revises: 2026_10_16_160000
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_17_090000'
+down_revision = '2026_10_16_160000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Estado descartável do rate limiter compartilhado: UNLOGGED evita o custo de WAL
+    op.create_table(
+        'rate_limit_buckets',
+        sa.Column('key', sa.String(), primary_key=True),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('refilled_at', sa.Float(), nullable=False),
+        sa.Column('allowed', sa.Boolean(), nullable=False),
+        prefixes=['UNLOGGED'],
+    )
+
+
+def downgrade():
+    op.drop_table('rate_limit_buckets')
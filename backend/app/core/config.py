@@ -10,6 +10,17 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     
+    # Pool de conexões (valem para o engine síncrono e para o assíncrono)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # espera máxima por uma conexão livre
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 desativa
+    DB_POOL_PRE_PING: bool = True  # descarta conexões mortas (ex.: após failover) antes de usar
+    DB_POOL_SLOW_CHECKOUT_SECONDS: float = 1.0  # checkouts mais lentos que isso geram um aviso no log
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # statement_timeout do Postgres no engine da API; 0 desativa
+    DB_POOL_WARMUP_CONNECTIONS: int = 2  # conexões abertas no startup (lifespan); 0 desativa
+    DB_WARMUP_TIMEOUT_SECONDS: float = 5.0
+    
     # Configurações de segurança
     SECRET_KEY: str
     ALGORITHM: str
@@ -20,13 +31,91 @@ class Settings(BaseSettings):
     GMAIL_APP_PASSWORD: Optional[str] = None
     WHATSAPP_CLOUD_API_ID: Optional[str] = None
     WHATSAPP_CLOUD_API_TOKEN: Optional[str] = None
+    WHATSAPP_API_BASE_URL: str = "https://graph.facebook.com/v17.0"
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587
+    SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    
+    # Outbox de notificações (worker de entrega)
+    OUTBOX_WORKER_ENABLED: bool = True
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_LEASE_SECONDS: int = 300
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0
+    OUTBOX_EMAIL_CONNECTIONS: int = 1
+    OUTBOX_WHATSAPP_CONCURRENCY: int = 10
+    
+    # Pool de hashing de senhas (bcrypt)
+    PASSWORD_HASH_EXECUTOR: str = "process"  # 'process' ou 'thread'
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # padrão: número de CPUs
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    
+    # Cache de usuários autenticados (get_current_user)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    
+    # Índice de disponibilidade de embarcações
+    AVAILABILITY_INDEX_REFRESH_SECONDS: int = 60  # intervalo da recarga em segundo plano (reservas de outros workers)
+    
+    # Cache das faixas de preço de parceiros (motor de preços)
+    PRICING_CACHE_TTL_SECONDS: int = 300
+    PRICING_CACHE_MAX_SIZE: int = 10000  # agendas de preço (embarcações) mantidas em memória (LRU)
+    
+    # Cache de respostas do catálogo (embarcações e marinas)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 30  # limite de defasagem para escritas feitas por outros workers
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    
+    # Busca geográfica de marinas
+    MARINA_GEO_INDEX_ENABLED: bool = True  # False: usa apenas o filtro por bounding box no SQL
+    MARINA_GEO_INDEX_CELL_DEGREES: float = 0.5
+    MARINA_GEO_INDEX_REFRESH_SECONDS: int = 300
+    
+    # Importação em lote (POST /api/{boats,marinas,partner-prices}/bulk)
+    BULK_IMPORT_MAX_BYTES: int = 200 * 1024 * 1024
+    BULK_IMPORT_CHUNK_ROWS: int = 5000
+    BULK_IMPORT_MAX_ERRORS: int = 1000  # erros detalhados no relatório; a contagem é sempre total
+    
+    # Exportações (GET /api/bookings/export, /api/users/export)
+    EXPORT_BATCH_SIZE: int = 1000  # linhas buscadas por vez no cursor do servidor
+    EXPORT_STATEMENT_TIMEOUT_MS: int = 900000  # statement_timeout das exportações (no lugar de DB_STATEMENT_TIMEOUT_MS); 0 desativa
+    
+    # Rate limiting de login e recuperação de senha (por IP e por usuário)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # 'memory' (por processo) ou 'postgres' (compartilhado entre workers)
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_MAX_KEYS: int = 100000  # buckets mantidos por processo (LRU) no backend em memória
+    RATE_LIMIT_TRUSTED_PROXIES: int = 0  # proxies confiáveis que acrescentam ao X-Forwarded-For; 0 ignora o cabeçalho
+    RATE_LIMIT_LOGIN_PER_IP: int = 20
+    RATE_LIMIT_LOGIN_PER_USERNAME: int = 5
+    RATE_LIMIT_LOGIN_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_RECOVERY_PER_IP: int = 5
+    RATE_LIMIT_RECOVERY_PER_USERNAME: int = 3
+    RATE_LIMIT_RECOVERY_WINDOW_SECONDS: int = 900
+    
+    # Métricas (GET /metrics, formato Prometheus)
+    METRICS_ENABLED: bool = True
+    
+    # Rastreamento de consultas por requisição
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # consultas mais lentas são registradas no log; 0 desativa
+    QUERY_BUDGET_MODE: str = "warn"  # 'warn' (produção), 'raise' (suíte de testes) ou 'off'
+    QUERY_BUDGET_DEFAULT: Optional[int] = None  # orçamento das rotas que não declaram query_budget
     
     # Outras configurações
     UPLOADS_DIR: str
+    UPLOAD_MAX_BYTES: int = 20 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    IMAGE_VARIANT_WORKERS: int = 2
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
+
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,367 @@
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import event
+from app.core.config import settings
+from contextvars import ContextVar
+from bisect import bisect_left
+from typing import Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "funntour"
+
+# Limites (em segundos) dos histogramas de latência por rota
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Requisições que não casaram com nenhuma rota (404) ficam numa série só
+UNMATCHED_ROUTE = "<unmatched>"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # o Response acrescenta o charset
+
+SLOW_QUERY_SECONDS = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+SLOW_QUERY_MAX_STATEMENT = 1000  # caracteres do SQL no log
+
+
+class RequestStats:
+    """
+    Consultas e tempo de banco da requisição em andamento (via contextvar),
+    com o orçamento de consultas declarado pela rota (query_budget).
+    """
+
+    __slots__ = ("scope", "queries", "db_seconds", "budget")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.budget = settings.QUERY_BUDGET_DEFAULT
+
+    def route_name(self) -> str:
+        route = self.scope.get("route") if self.scope is not None else None
+        if route is None:
+            return UNMATCHED_ROUTE
+        return f"{self.scope['method']} {route.path} ({route.name})"
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class Histogram:
+    """
+    Histograma devolvido pelo stats() de um coletor: contagem por faixa
+    (não cumulativa; a última é acima do maior limite), soma e total de
+    observações. Vira as séries _bucket/_sum/_count do Prometheus.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple, counts: list, sum: float, count: int):
+        self.bounds = bounds
+        self.counts = counts
+        self.sum = sum
+        self.count = count
+
+
+class RouteMetrics:
+    """Contadores de uma rota (método + template do path)."""
+
+    __slots__ = ("buckets", "count", "seconds", "statuses", "queries", "db_seconds")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.statuses = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+class MetricsRegistry:
+    """
+    Métricas da API no formato de texto do Prometheus.
+
+    Os contadores são atributos simples atualizados no event loop (sem
+    locks); as séries por rota são criadas na primeira requisição de cada
+    rota e reaproveitadas depois. Estatísticas de outros componentes
+    (pools, caches, worker) entram por register_collector() e são lidas só
+    quando /metrics é consultado.
+    """
+
+    def __init__(self):
+        self._routes = {}  # (método, rota) -> RouteMetrics
+        self._collectors = []  # (nome, função de stats, rótulo, contadores)
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            metrics = self._routes[key] = RouteMetrics()
+        metrics.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        metrics.count += 1
+        metrics.seconds += seconds
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.queries += stats.queries
+        metrics.db_seconds += stats.db_seconds
+
+    def observe_query(self, seconds: float):
+        self.db_queries += 1
+        self.db_seconds += seconds
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+    def register_collector(self, name: str, stats, label: str = None, counters=()):
+        """
+        `stats()` retorna {métrica: valor}; com `label`, retorna
+        {valor do rótulo: {métrica: valor}} (ex.: um bloco por engine).
+
+        As métricas listadas em `counters` são contadores (recebem o sufixo
+        _total); valores Histogram viram histogramas; os demais números,
+        gauges.
+        """
+        self._collectors.append((name, stats, label, frozenset(counters)))
+
+    def instrument_engine(self, engine):
+        """Registra os hooks de cursor que medem as consultas de um engine síncrono."""
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def render(self) -> str:
+        lines = []
+        self._render_routes(lines)
+        lines.append(f"# TYPE {PREFIX}_db_queries_total counter")
+        lines.append(f"{PREFIX}_db_queries_total {self.db_queries}")
+        lines.append(f"# TYPE {PREFIX}_db_query_seconds_total counter")
+        lines.append(f"{PREFIX}_db_query_seconds_total {self.db_seconds:.6f}")
+        for name, stats, label, counters in self._collectors:
+            # Amostras agrupadas por métrica: com rótulo, cada bloco contribui para todas
+            families = {}
+            if label is None:
+                _collect_stats(families, f"{PREFIX}_{name}", stats(), "", counters)
+            else:
+                for value, group in stats().items():
+                    _collect_stats(families, f"{PREFIX}_{name}", group, f'{label}="{value}"', counters)
+            for family, (kind, samples) in families.items():
+                lines.append(f"# TYPE {family} {kind}")
+                lines.extend(samples)
+        lines.append("")
+        return "\n".join(lines)
+
+    def _render_routes(self, lines: list):
+        routes = sorted(self._routes.items())
+        lines.append(f"# TYPE {PREFIX}_http_requests_total counter")
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(
+                    f'{PREFIX}_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}'
+                )
+        lines.append(f"# TYPE {PREFIX}_http_request_duration_seconds histogram")
+        for (method, route), metrics in routes:
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), metrics.buckets):
+                cumulative += count
+                lines.append(f'{PREFIX}_http_request_duration_seconds_bucket{{{labels},le="{_le(bound)}"}} {cumulative}')
+            lines.append(f"{PREFIX}_http_request_duration_seconds_sum{{{labels}}} {metrics.seconds:.6f}")
+            lines.append(f"{PREFIX}_http_request_duration_seconds_count{{{labels}}} {metrics.count}")
+        lines.append(f"# TYPE {PREFIX}_http_db_queries_total counter")
+        for (method, route), metrics in routes:
+            lines.append(f'{PREFIX}_http_db_queries_total{{method="{method}",route="{route}"}} {metrics.queries}')
+        lines.append(f"# TYPE {PREFIX}_http_db_seconds_total counter")
+        for (method, route), metrics in routes:
+            lines.append(f'{PREFIX}_http_db_seconds_total{{method="{method}",route="{route}"}} {metrics.db_seconds:.6f}')
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _sample(name: str, labels: str, value) -> str:
+    return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+def _collect_stats(families: dict, prefix: str, stats: dict, labels: str, counters: frozenset):
+    # families: {nome da métrica: (tipo, amostras)}; valores não numéricos ficam de fora
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, Histogram):
+            samples = families.setdefault(name, ("histogram", []))[1]
+            cumulative = 0
+            for bound, count in zip(value.bounds + (float("inf"),), value.counts):
+                cumulative += count
+                le = f'le="{_le(bound)}"'
+                samples.append(_sample(f"{name}_bucket", f"{labels},{le}" if labels else le, cumulative))
+            samples.append(_sample(f"{name}_sum", labels, f"{value.sum:.6f}"))
+            samples.append(_sample(f"{name}_count", labels, value.count))
+            continue
+        if isinstance(value, bool):
+            value = int(value)
+        if not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            if not name.endswith("_total"):
+                name = f"{name}_total"
+            families.setdefault(name, ("counter", []))[1].append(_sample(name, labels, value))
+        else:
+            families.setdefault(name, ("gauge", []))[1].append(_sample(name, labels, value))
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Tipos dos parâmetros de uma consulta, sem os valores (que podem ser dados pessoais)."""
+    if executemany and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+# O início fica no contexto de execução: se a consulta falhar, não sobra estado na conexão
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    metrics.observe_query(elapsed)
+    if SLOW_QUERY_SECONDS and elapsed >= SLOW_QUERY_SECONDS:
+        stats = current_request.get()
+        logger.warning(
+            "Consulta lenta (%.1fms) em %s: %s | parâmetros: %s",
+            elapsed * 1000,
+            stats.route_name() if stats is not None else "fora de requisição",
+            " ".join(statement.split())[:SLOW_QUERY_MAX_STATEMENT],
+            parameter_shape(parameters, executemany),
+        )
+
+
+def query_budget(limit: int):
+    """
+    Dependência que declara o máximo de consultas SQL de uma rota:
+
+        @router.get("/", dependencies=[Depends(query_budget(4))])
+
+    Requisições acima do orçamento geram um aviso no log, ou respondem 500
+    com QUERY_BUDGET_MODE=raise (suíte de testes).
+    O orçamento deve considerar a consulta do usuário autenticado quando
+    ele não está no cache.
+    """
+    async def declare_budget():
+        stats = current_request.get()
+        if stats is not None:
+            stats.budget = limit
+    return declare_budget
+
+
+def exceeded_query_budget(stats: RequestStats) -> Optional[str]:
+    """Descrição do excesso, ou None se a requisição está dentro do orçamento."""
+    if stats.budget is None or stats.queries <= stats.budget or settings.QUERY_BUDGET_MODE == "off":
+        return None
+    return f"{stats.route_name()} fez {stats.queries} consultas (orçamento: {stats.budget})"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede a latência e o status de cada requisição e
+    atribui a ela as consultas feitas durante o processamento. A rota é o
+    template do path (/api/boats/{boat_id}), para manter a cardinalidade
+    limitada.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"], route.path if route is not None else UNMATCHED_ROUTE, status, elapsed, stats
+            )
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware ASGI que confere o orçamento de consultas da rota (declarado
+    com query_budget) usando a contagem de MetricsMiddleware.
+
+    O início da resposta fica retido até o primeiro trecho do corpo: nesse
+    ponto a rota já fez suas consultas e, com QUERY_BUDGET_MODE=raise, a
+    resposta ainda pode ser trocada por um 500. Consultas feitas depois
+    (respostas em streaming) só geram aviso no log. Deve ficar dentro do
+    CORSMiddleware, para que o 500 também leve os cabeçalhos de CORS.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        stats = current_request.get()
+        if scope["type"] != "http" or stats is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_start = None
+        checked = False
+        reported = False
+        replaced = False
+
+        async def send_checked(message):
+            nonlocal response_start, checked, reported, replaced
+            if replaced:
+                return  # corpo da resposta original, já substituída pelo 500
+            if message["type"] == "http.response.start":
+                response_start = message
+                return
+            if message["type"] == "http.response.body" and not checked:
+                checked = True
+                exceeded = exceeded_query_budget(stats)
+                reported = exceeded is not None
+                if exceeded is not None and settings.QUERY_BUDGET_MODE == "raise":
+                    logger.error("Orçamento de consultas excedido: %s", exceeded)
+                    replaced = True
+                    response = ORJSONResponse({"detail": f"Orçamento de consultas excedido: {exceeded}"}, status_code=500)
+                    await response(scope, receive, send)
+                    return
+                if exceeded is not None:
+                    logger.warning("Orçamento de consultas excedido: %s", exceeded)
+            if response_start is not None:
+                await send(response_start)
+                response_start = None
+            await send(message)
+
+        await self.app(scope, receive, send_checked)
+        if not reported:
+            exceeded = exceeded_query_budget(stats)
+            if exceeded is not None:
+                logger.warning("Orçamento de consultas excedido após o início da resposta: %s", exceeded)
+
+
+metrics = MetricsRegistry()
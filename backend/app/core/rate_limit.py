@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from sqlalchemy import case, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import get_settings
+import logging
+import math
+import threading
+import time
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    Token buckets em memória, por processo.
+
+    As chaves são distribuídas em shards, cada um com seu lock e seu LRU
+    limitado, para que verificações concorrentes (threads do threadpool)
+    não disputem um lock global. Decisão O(1), sem I/O.
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100000):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(max(1, shards))]
+        self._max_keys_per_shard = max(1, max_keys // len(self._shards))
+
+    async def hit(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0):
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            tokens, refilled_at = buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - refilled_at) * refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            buckets[key] = (tokens, now)
+            buckets.move_to_end(key)
+            if len(buckets) > self._max_keys_per_shard:
+                buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class PostgresBackend:
+    """
+    Token buckets compartilhados entre workers na tabela UNLOGGED
+    rate_limit_buckets (migração 2026_10_17_090000).
+
+    Cada verificação é um único upsert atômico (recarga + consumo no
+    próprio banco, sem SELECT prévio). A cada `cleanup_every` verificações,
+    os buckets parados há mais de `idle_seconds` são removidos.
+    """
+
+    def __init__(self, cleanup_every: int = 1000, idle_seconds: int = 86400):
+        self.cleanup_every = cleanup_every
+        self.idle_seconds = idle_seconds
+        self._hits = 0
+
+    async def hit(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0):
+        # Importados aqui: app.db.base importa os modelos, que dependem de app.core
+        from app.db.base import async_engine
+        from app.db.models.rate_limit_bucket import RateLimitBucket as Bucket
+
+        now = func.extract("epoch", func.clock_timestamp())
+        refilled = func.least(capacity, Bucket.tokens + (now - Bucket.refilled_at) * refill_per_second)
+        statement = (
+            insert(Bucket)
+            .values(key=key, tokens=capacity - cost, refilled_at=now, allowed=True)
+            .on_conflict_do_update(
+                index_elements=[Bucket.key],
+                set_={
+                    "tokens": case((refilled >= cost, refilled - cost), else_=refilled),
+                    "allowed": refilled >= cost,
+                    "refilled_at": now,
+                },
+            )
+            .returning(Bucket.allowed, Bucket.tokens)
+        )
+        async with async_engine.begin() as conn:
+            allowed, tokens = (await conn.execute(statement)).one()
+            self._hits += 1
+            if self._hits % self.cleanup_every == 0:
+                await conn.execute(delete(Bucket).where(Bucket.refilled_at < now - self.idle_seconds))
+        return allowed, tokens
+
+
+class RateLimiter:
+    """
+    Limites por IP e por usuário para as rotas que custam caro mesmo
+    quando falham (bcrypt no login, gravação + email na recuperação de
+    senha).
+
+    As rotas chamam check() antes de qualquer consulta ou hash, de modo que
+    uma tentativa rejeitada custa apenas a verificação do bucket. Cada
+    regra permite `limit` tentativas por `window` segundos (token bucket
+    com rajada = limit e recarga contínua).
+    """
+
+    def __init__(self, backend, rules: dict, trusted_proxies: int = 0, enabled: bool = True):
+        self.backend = backend
+        self.rules = rules  # nome -> (limite por IP, limite por usuário, janela em segundos)
+        self.trusted_proxies = trusted_proxies  # proxies à frente da API que acrescentam ao X-Forwarded-For
+        self.enabled = enabled
+
+        # Métricas
+        self.allowed = 0
+        self.rejected = 0
+        self.backend_errors = 0
+
+    def client_ip(self, request: Request) -> str:
+        if self.trusted_proxies:
+            # Cada proxy acrescenta à direita o endereço de quem o chamou: as entradas à
+            # esquerda vêm do cliente e podem ser forjadas. Com N proxies confiáveis, o
+            # cliente é o N-ésimo endereço a partir da direita.
+            forwarded = [
+                address.strip()
+                for header in request.headers.getlist("x-forwarded-for")
+                for address in header.split(",")
+                if address.strip()
+            ]
+            if len(forwarded) >= self.trusted_proxies:
+                return forwarded[-self.trusted_proxies]
+        return request.client.host if request.client else "unknown"
+
+    async def _hit(self, key: str, limit: int, window: float):
+        try:
+            allowed, tokens = await self.backend.hit(key, limit, limit / window)
+        except Exception:
+            # Falha do backend compartilhado não deve derrubar o login
+            self.backend_errors += 1
+            logger.exception("Erro no backend do rate limiter; requisição liberada")
+            return True, 0.0
+        retry_after = 0.0 if allowed else (1 - tokens) * window / limit
+        return allowed, retry_after
+
+    async def check(self, request: Request, rule: str, username: str = None):
+        if not self.enabled:
+            return
+        per_ip, per_username, window = self.rules[rule]
+        keys = [(f"{rule}:ip:{self.client_ip(request)}", per_ip)]
+        if username:
+            keys.append((f"{rule}:user:{username}", per_username))
+        for key, limit in keys:
+            allowed, retry_after = await self._hit(key, limit, window)
+            if not allowed:
+                self.rejected += 1
+                retry_after = max(1, math.ceil(retry_after))
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Muitas tentativas. Tente novamente em {retry_after} segundos.",
+                    headers={"Retry-After": str(retry_after)},
+                )
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "backend_errors": self.backend_errors,
+        }
+
+
+def _build_backend():
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresBackend()
+    return MemoryBackend(shards=settings.RATE_LIMIT_SHARDS, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+RECOVERY_LIMITS = (
+    settings.RATE_LIMIT_RECOVERY_PER_IP,
+    settings.RATE_LIMIT_RECOVERY_PER_USERNAME,
+    settings.RATE_LIMIT_RECOVERY_WINDOW_SECONDS,
+)
+
+rate_limiter = RateLimiter(
+    backend=_build_backend(),
+    rules={
+        "login": (
+            settings.RATE_LIMIT_LOGIN_PER_IP,
+            settings.RATE_LIMIT_LOGIN_PER_USERNAME,
+            settings.RATE_LIMIT_LOGIN_WINDOW_SECONDS,
+        ),
+        # Pedido do código e troca da senha (tentativas de adivinhar o código) em buckets separados
+        "recovery": RECOVERY_LIMITS,
+        "reset": RECOVERY_LIMITS,
+    },
+    trusted_proxies=settings.RATE_LIMIT_TRUSTED_PROXIES,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from fastapi import Request, Response
+from app.core.config import get_settings
+import hashlib
+import orjson
+import threading
+import time
+
+settings = get_settings()
+
+
+class CachedResponse:
+    """Corpo JSON já serializado de uma resposta, com seu ETag e metadados para autorização."""
+
+    __slots__ = ("body", "etag", "meta")
+
+    def __init__(self, body: bytes, meta: dict = None):
+        self.body = body
+        # ETag forte derivado do conteúdo: vale entre workers e reinícios
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.meta = meta or {}
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    # Comparação fraca (RFC 9110): ignora o prefixo W/
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    """
+    Cache em memória das respostas de leitura do catálogo, já serializadas.
+
+    Cada tabela tem um contador de versão; as rotas de escrita chamam
+    invalidate(tabela), o que incrementa a versão e descarta as entradas
+    da tabela. Uma leitura que começou antes da invalidação não grava o
+    resultado (ver set()), evitando repovoar o cache com dados antigos.
+    Escritas feitas por outros workers são refletidas em até
+    RESPONSE_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 30, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries = OrderedDict()  # (tabela, chave) -> (expira_em, CachedResponse)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def get(self, table: str, key) -> CachedResponse:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[(table, key)]
+                self.misses += 1
+                return None
+            self._entries.move_to_end((table, key))
+            self.hits += 1
+            return entry[1]
+
+    def set(self, table: str, key, content, version: int, meta: dict = None) -> CachedResponse:
+        """
+        Serializa `content` (modelo pydantic) e grava no cache, desde que a
+        tabela não tenha sido invalidada desde `version` (lida antes da consulta).
+        """
+        cached = CachedResponse(orjson.dumps(content.model_dump(mode="json")), meta)
+        if not self.enabled:
+            return cached
+        with self._lock:
+            if self._versions.get(table, 0) == version:
+                self._entries[(table, key)] = (time.monotonic() + self.ttl_seconds, cached)
+                self._entries.move_to_end((table, key))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return cached
+
+    def respond(self, request: Request, cached: CachedResponse) -> Response:
+        """Resposta 304 se o cliente já tem esta versão (If-None-Match), senão o corpo em cache."""
+        headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, cached.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *tables: str):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self.invalidations += 1
+            for entry_key in [k for k in self._entries if k[0] in tables]:
+                del self._entries[entry_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
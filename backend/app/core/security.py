@@ -1,19 +1,21 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.db.models.user import User
 from app.core.config import get_settings
+from app.services.password_hasher import password_hasher, pwd_context
+from app.core.principal_cache import principal_cache
 from typing import Optional
 import random
 import string
+import re
 
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 ALGORITHM = "HS256"
@@ -26,6 +28,14 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+# Versões assíncronas: executam o bcrypt no pool dedicado, fora do event loop
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -45,7 +55,7 @@ def validate_recovery_code(code: str) -> bool:
     return bool(re.match(r'^\d{6}$', code))
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ):
     credentials_exception = HTTPException(
@@ -61,7 +71,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    # Usuário em cache: evita a consulta ao banco em toda requisição autenticada
+    user = principal_cache.get(username)
+    if user is not None:
+        return user
+    
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
         raise credentials_exception
+    
+    # Desanexar da sessão: a instância em cache é compartilhada entre requisições
+    db.expunge(user)
+    principal_cache.set(username, user, token_exp=payload.get("exp"))
     return user
@@ -1,19 +1,52 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.db.pool import engine_options, sync_pool_metrics, async_pool_metrics
+from app.core.metrics import metrics
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+# Engine síncrono: usado por scripts (init_db, migrate, alembic). Sem
+# statement_timeout: DDL e criação de índices em bancos grandes passam dele.
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    **engine_options(sync_pool_metrics),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrono (asyncpg): usado pelas rotas da API
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    connect_args={"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}},
+    **engine_options(async_pool_metrics, AsyncAdaptedQueuePool),
+)
+# Contagem e tempo das consultas, atribuídos à requisição em andamento
+# (/metrics, log de consultas lentas e orçamento de consultas por rota)
+metrics.instrument_engine(engine)
+metrics.instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
-# Importar todos os modelos para garantir que sejam criados
+# Importar todos os modelos para registrá-los no metadata e configurar os
+# relacionamentos. Importar este módulo não conecta ao banco: o esquema é
+# criado por init_db.py / migrações do Alembic, e o pool é aquecido no
+# lifespan da aplicação (main.py).
 from app.db.models.user import User
 from app.db.models.boat import Boat
 from app.db.models.marina import Marina
 from app.db.models.booking import Booking
 from app.db.models.partner_price import PartnerPrice
+from app.db.models.notification_outbox import NotificationOutbox
+from app.db.models.rate_limit_bucket import RateLimitBucket
 
-# Criar todas as tabelas
-Base.metadata.create_all(bind=engine)
+# Funções, triggers e constraints que os modelos não descrevem (ver app/db/ddl.py)
+from app.db.ddl import attach_ddl
+attach_ddl(Base.metadata)
@@ -0,0 +1,65 @@
+from sqlalchemy import DDL, event
+
+# DDL que o create_all não gera a partir dos modelos (funções, triggers e a
+# exclusion constraint das reservas). Bancos criados por init_db.py recebem
+# tudo junto com as tabelas; bancos existentes recebem o mesmo SQL pelas
+# migrações 2026_10_16_090000 e 2026_10_16_160000.
+
+# Antes das tabelas: extensões e funções usadas pelos triggers e pela busca
+BEFORE_TABLES = (
+    # btree_gist permite combinar igualdade (boat_id) e sobreposição de intervalos no mesmo índice GiST
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() é STABLE (depende do search_path); o wrapper com dicionário
+    # explícito pode ser IMMUTABLE e, portanto, usado em índices
+    """
+    CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS $$
+        SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """,
+    # Documento de busca: nome com peso A, descrição com peso B
+    """
+    CREATE OR REPLACE FUNCTION search_document(name text, description text) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('portuguese', f_unaccent(coalesce(name, ''))), 'A')
+            || setweight(to_tsvector('portuguese', f_unaccent(coalesce(description, ''))), 'B')
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := search_document(NEW.name, NEW.description);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+# Tabelas com coluna search_vector mantida por trigger
+SEARCH_TABLES = ("boats", "marinas")
+
+# Impede reservas ativas sobrepostas para a mesma embarcação; o índice GiST
+# criado pela constraint também atende a busca de embarcações livres
+BOOKINGS_NO_OVERLAP = """
+    ALTER TABLE bookings
+    ADD CONSTRAINT bookings_no_overlap
+    EXCLUDE USING gist (
+        boat_id WITH =,
+        tsrange(start_date, end_date, '[)') WITH &&
+    )
+    WHERE (status IS DISTINCT FROM 'cancelled')
+"""
+
+
+def attach_ddl(metadata):
+    """Registra o DDL acima nos eventos de criação do metadata (create_all)."""
+    for statement in BEFORE_TABLES:
+        event.listen(metadata, "before_create", DDL(statement).execute_if(dialect="postgresql"))
+    for name in SEARCH_TABLES:
+        event.listen(metadata.tables[name], "after_create", DDL(f"""
+            CREATE TRIGGER {name}_search_vector_update
+            BEFORE INSERT OR UPDATE OF name, description ON {name}
+            FOR EACH ROW EXECUTE FUNCTION search_vector_update()
+        """).execute_if(dialect="postgresql"))
+    event.listen(
+        metadata.tables["bookings"], "after_create", DDL(BOOKINGS_NO_OVERLAP).execute_if(dialect="postgresql")
+    )
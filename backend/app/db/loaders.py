@@ -0,0 +1,35 @@
+from sqlalchemy.orm import selectinload, joinedload
+from app.db.models.booking import Booking
+from app.db.models.marina import Marina
+from app.db.models.partner_price import PartnerPrice
+
+# Perfis de carregamento (eager loading) por endpoint.
+#
+# Os schemas de resposta aninham objetos relacionados (Booking -> user/boat,
+# PartnerPrice -> partner/boat, Marina -> boats). Sem estes perfis cada linha
+# serializada dispararia um lazy load (N+1), o que com AsyncSession nem é
+# permitido. Listas usam selectinload: uma consulta extra por relacionamento,
+# independente do tamanho da página. Detalhes usam joinedload para
+# relacionamentos many-to-one, resolvendo tudo numa única consulta.
+LOADER_PROFILES = {
+    "booking_list": (selectinload(Booking.user), selectinload(Booking.boat)),
+    "booking_detail": (joinedload(Booking.user), joinedload(Booking.boat)),
+    "partner_price_list": (selectinload(PartnerPrice.partner), selectinload(PartnerPrice.boat)),
+    "partner_price_detail": (joinedload(PartnerPrice.partner), joinedload(PartnerPrice.boat)),
+    "marina_list": (selectinload(Marina.boats),),
+    "marina_detail": (selectinload(Marina.boats),),
+}
+
+
+def with_profile(query, profile: str):
+    """Aplica à consulta as opções de carregamento do perfil informado."""
+    return query.options(*LOADER_PROFILES[profile])
+
+
+async def get_with_profile(db, entity, ident, profile: str):
+    """
+    Carrega (ou recarrega) uma linha pela chave primária com o perfil
+    informado. Usado após commits para devolver a resposta já com os
+    relacionamentos carregados.
+    """
+    return await db.get(entity, ident, options=LOADER_PROFILES[profile], populate_existing=True)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.db.base import Base
 from app.db.models.user import User
 from app.db.models.marina import Marina
@@ -7,6 +8,14 @@ from app.db.models.marina import Marina
 
 class Boat(Base):
     __tablename__ = "boats"
+    __table_args__ = (
+        # GET /api/boats/search: ordenação por preço/capacidade das embarcações disponíveis
+        Index("ix_boats_available_price", "price_per_day", "id", postgresql_where=text("is_available")),
+        Index("ix_boats_available_capacity", "capacity", "id", postgresql_where=text("is_available")),
+        Index("ix_boats_available_marina_price", "marina_id", "price_per_day", "id", postgresql_where=text("is_available")),
+        Index("ix_boats_owner_id_id", "owner_id", "id"),
+        Index("ix_boats_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -21,7 +30,12 @@ class Boat(Base):
     owner = relationship("User", back_populates="boats")
     marina = relationship("Marina", back_populates="boats")
     bookings = relationship("Booking", back_populates="boat")
+    partner_prices = relationship("PartnerPrice", back_populates="boat")
     
     # Campos de imagem
     main_image_url = Column(String)
-    gallery_images = Column(String)  # JSON string com URLs das imagens
+    gallery_images = Column(JSONB)  # lista de URLs das imagens
+    image_variants = Column(JSON)  # URLs das variantes da imagem principal (thumbnail, card, full)
+    
+    # Busca textual (GET /api/search): mantido por trigger a partir de name e description
+    search_vector = deferred(Column(TSVECTOR))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -7,6 +7,12 @@ from app.db.models.boat import Boat
 
 class Booking(Base):
     __tablename__ = "bookings"
+    # Reservas ativas sobrepostas para a mesma embarcação são bloqueadas pela
+    # exclusion constraint "bookings_no_overlap" (app/db/ddl.py e migração 2026_10_16_090000)
+    __table_args__ = (
+        # Paginação por cursor das reservas de um usuário
+        Index("ix_bookings_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.db.base import Base
 
 class Marina(Base):
     __tablename__ = "marinas"
+    __table_args__ = (
+        # Pré-filtro por bounding box da busca por proximidade
+        Index("ix_marinas_latitude_longitude", "latitude", "longitude"),
+        # Filtro por serviços oferecidos (services @> '["combustivel"]')
+        Index("ix_marinas_services", "services", postgresql_using="gin"),
+        Index("ix_marinas_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -13,11 +21,15 @@ class Marina(Base):
     address = Column(String)
     contact_phone = Column(String)
     contact_email = Column(String)
-    services = Column(String)  # JSON string com serviços oferecidos
+    services = Column(JSONB)  # lista de serviços oferecidos
     
     # Relacionamentos
     boats = relationship("Boat", back_populates="marina")
     
     # Campos de imagem
     main_image_url = Column(String)
-    gallery_images = Column(String)  # JSON string com URLs das imagens
+    gallery_images = Column(JSONB)  # lista de URLs das imagens
+    image_variants = Column(JSON)  # URLs das variantes da imagem principal (thumbnail, card, full)
+    
+    # Busca textual (GET /api/search): mantido por trigger a partir de name e description
+    search_vector = deferred(Column(TSVECTOR))
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Float, Boolean
+from app.db.base import Base
+
+class RateLimitBucket(Base):
+    """
+    Token buckets do rate limiter compartilhado (RATE_LIMIT_BACKEND=postgres).
+
+    Tabela UNLOGGED: é estado descartável, não precisa de WAL nem sobrevive a
+    um crash (os limites simplesmente recomeçam cheios).
+    """
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    refilled_at = Column(Float, nullable=False)  # epoch (segundos) da última recarga
+    allowed = Column(Boolean, nullable=False)  # resultado da última tentativa
@@ -31,3 +31,4 @@ class User(Base):
     # Relationships
     boats = relationship("Boat", back_populates="owner")
     bookings = relationship("Booking", back_populates="user")
+    partner_prices = relationship("PartnerPrice", back_populates="partner")
@@ -0,0 +1,93 @@
+from fastapi import HTTPException
+from sqlalchemy import tuple_, BigInteger, SmallInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+import base64
+import json
+
+MAX_PAGE_SIZE = 1000
+
+# Bits das colunas inteiras: valores fora da faixa dariam erro no banco
+INTEGER_BITS = ((BigInteger, 64), (SmallInteger, 16))
+
+
+def encode_cursor(values) -> str:
+    """Cursor opaco: posição (chave de ordenação) do último item da página."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError
+        return [_cursor_value(column.type, value) for column, value in zip(columns, payload)]
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _cursor_value(column_type, value):
+    """Valida (e converte) um valor do cursor contra o tipo da coluna antes de chegar ao SQL."""
+    python_type = column_type.python_type
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise TypeError
+        value = datetime.fromisoformat(value)
+        if value.tzinfo is not None and not column_type.timezone:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if python_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    # bool é subclasse de int: true/false não valem como id
+    if not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+        raise TypeError
+    if python_type is int:
+        bits = next((bits for kind, bits in INTEGER_BITS if isinstance(column_type, kind)), 32)
+        if not -(2 ** (bits - 1)) <= value < 2 ** (bits - 1):
+            raise ValueError
+    return value
+
+
+def keyset_query(query, cursor: str = None, limit: int = 100, order_by=None, descending: bool = False):
+    """
+    Aplica o cursor, a ordenação e o limite (+1, para saber se há próxima
+    página) à consulta. Retorna (consulta, colunas de ordenação, limite).
+    """
+    if order_by is None:
+        entity = query.column_descriptions[0]["entity"]
+        order_by = [entity.id]
+
+    if cursor:
+        values = decode_cursor(cursor, order_by)
+        key = order_by[0] if len(order_by) == 1 else tuple_(*order_by)
+        after = values[0] if len(order_by) == 1 else tuple_(*values)
+        query = query.where(key < after if descending else key > after)
+
+    ordering = [column.desc() for column in order_by] if descending else order_by
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return query.order_by(*ordering).limit(limit + 1), order_by, limit
+
+
+async def paginate(db: AsyncSession, query, cursor: str = None, limit: int = 100, order_by=None, descending: bool = False) -> dict:
+    """
+    Paginação por keyset (cursor) em vez de OFFSET.
+
+    A consulta é ordenada pelas colunas de `order_by` (por padrão a chave
+    primária da entidade selecionada), que precisam formar uma ordenação
+    única e estável, todas ascendentes ou, com `descending`, todas
+    descendentes. Em vez de descartar `skip` linhas, a próxima página
+    começa logo após a chave do último item, usando o índice.
+    """
+    query, order_by, limit = keyset_query(query, cursor, limit, order_by, descending)
+    rows = (await db.scalars(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_by])
+
+    return {"items": rows, "next_cursor": next_cursor}
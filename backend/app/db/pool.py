@@ -0,0 +1,108 @@
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+from app.core.metrics import Histogram
+from bisect import bisect_left
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) do histograma de espera por conexão
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """
+    Telemetria do pool de conexões de um engine: tempo de espera no
+    checkout (histograma), timeouts e a ocupação atual do pool.
+
+    Os contadores são atualizados por _TimedCheckout a cada conexão
+    retirada do pool; a ocupação (em uso, ociosas, overflow) é lida do
+    próprio pool em stats().
+    """
+
+    def __init__(self, name: str, slow_checkout_seconds: float = 1.0):
+        self.name = name
+        self.slow_checkout_seconds = slow_checkout_seconds
+        self.pool = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)  # último: acima do maior limite
+
+    def observe(self, pool, wait: float, timed_out: bool = False):
+        self.pool = pool
+        if timed_out:
+            self.timeouts += 1
+            logger.error(
+                "Pool %s esgotado: timeout após %.2fs aguardando conexão (%s)",
+                self.name, wait, pool.status(),
+            )
+            return
+        self.checkouts += 1
+        self.wait_seconds_total += wait
+        if wait > self.wait_seconds_max:
+            self.wait_seconds_max = wait
+        self.wait_buckets[bisect_left(WAIT_BUCKETS, wait)] += 1
+        if wait >= self.slow_checkout_seconds:
+            logger.warning("Pool %s: checkout levou %.2fs (%s)", self.name, wait, pool.status())
+
+    def stats(self) -> dict:
+        pool = self.pool
+        return {
+            "size": pool.size() if pool is not None else settings.DB_POOL_SIZE,
+            "in_use": pool.checkedout() if pool is not None else 0,
+            "idle": pool.checkedin() if pool is not None else 0,
+            "overflow": max(pool.overflow(), 0) if pool is not None else 0,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds": Histogram(WAIT_BUCKETS, list(self.wait_buckets), self.wait_seconds_total, self.checkouts),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class _TimedCheckout:
+    """Mede o tempo gasto em _do_get (espera por uma conexão livre ou nova)."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe(self, time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe(self, time.perf_counter() - start)
+        return connection
+
+
+def timed_pool_class(base, metrics: PoolMetrics):
+    # Classe própria por engine: recreate() (dispose, failover) preserva as métricas
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"metrics": metrics})
+
+
+def engine_options(metrics: PoolMetrics, base=QueuePool) -> dict:
+    """Argumentos de create_engine/create_async_engine com o pool configurado em Settings."""
+    return {
+        "poolclass": timed_pool_class(base, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+sync_pool_metrics = PoolMetrics("sync", settings.DB_POOL_SLOW_CHECKOUT_SECONDS)
+async_pool_metrics = PoolMetrics("async", settings.DB_POOL_SLOW_CHECKOUT_SECONDS)
+
+
+def pool_stats() -> dict:
+    return {
+        "sync": sync_pool_metrics.stats(),
+        "async": async_pool_metrics.stats(),
+    }
+
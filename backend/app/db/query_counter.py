@@ -0,0 +1,65 @@
+from sqlalchemy import event
+from app.db.base import async_engine
+from contextlib import contextmanager
+
+
+class QueryCounter:
+    """Conta os comandos SQL executados pelo engine enquanto estiver ativo."""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Uso:
+        with count_queries() as counter:
+            ...
+        counter.count
+    """
+    engine = (engine or async_engine).sync_engine
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._on_execute)
+
+
+async def assert_constant_query_count(client, path: str, page_sizes=(1, 10, 100), headers=None, params=None) -> dict:
+    """
+    Verifica que a quantidade de consultas de um endpoint paginado não cresce
+    com o tamanho da página (ou seja, que não há N+1).
+
+    `client` é um httpx.AsyncClient apontando para a aplicação (por exemplo
+    com ASGITransport). Uma requisição de aquecimento é feita antes, para que
+    caches em memória (usuário autenticado, índices) não distorçam a contagem.
+    Retorna {tamanho_da_página: consultas}; levanta AssertionError (explícito,
+    para valer também com python -O) se a contagem variar ou a resposta não
+    for 200.
+    """
+    params = dict(params or {})
+    response = await client.get(path, params={**params, "limit": page_sizes[0]}, headers=headers)
+    _check_status(path, response)
+
+    counts = {}
+    for size in page_sizes:
+        with count_queries() as counter:
+            response = await client.get(path, params={**params, "limit": size}, headers=headers)
+        _check_status(path, response)
+        counts[size] = counter.count
+
+    if len(set(counts.values())) != 1:
+        raise AssertionError(f"{path}: quantidade de consultas varia com o tamanho da página: {counts}")
+    return counts
+
+
+def _check_status(path: str, response):
+    if response.status_code != 200:
+        raise AssertionError(f"{path}: HTTP {response.status_code} {response.text[:200]}")
@@ -1,9 +1,44 @@
-from sqlalchemy.orm import sessionmaker
-from app.db.base import engine, SessionLocal
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker, configure_mappers
+from app.db.base import engine, SessionLocal, async_engine, AsyncSessionLocal
+from app.core.config import settings
+import asyncio
+import logging
+import time
 
-def get_db():
-    db = SessionLocal()
-    try:
+logger = logging.getLogger(__name__)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+async def _open_connection():
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def warm_up():
+    """
+    Prepara a aplicação para a primeira requisição: configura os mappers do
+    ORM e abre DB_POOL_WARMUP_CONNECTIONS conexões no pool assíncrono.
+
+    Falhas de conexão só geram aviso: o worker sobe mesmo com o banco
+    indisponível e as conexões são abertas sob demanda depois (pre-ping).
+    """
+    start = time.perf_counter()
+    configure_mappers()
+    connections = min(settings.DB_POOL_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE)
+    if connections > 0:
+        try:
+            # Conexões abertas ao mesmo tempo, para que o pool retenha todas
+            await asyncio.wait_for(
+                asyncio.gather(*[_open_connection() for _ in range(connections)]),
+                timeout=settings.DB_WARMUP_TIMEOUT_SECONDS,
+            )
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            logger.warning("Aquecimento do pool de conexões falhou; seguindo sem ele: %s", e)
+            return
+    logger.info(
+        "Aquecimento concluído: %d conexões em %.1fms",
+        connections, (time.perf_counter() - start) * 1000,
+    )
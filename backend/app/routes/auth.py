@@ -1,49 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.db.models.user import User
-from app.core.security import get_password_hash, create_access_token, verify_password, generate_recovery_code, validate_recovery_code
-from app.schemas.user import UserCreate, UserUpdate
-from app.core.config import settings
+from app.core.security import get_current_user, get_password_hash_async, create_access_token, verify_password_async, generate_recovery_code, validate_recovery_code
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import rate_limiter
+from app.schemas.user import UserCreate, UserUpdate, User as UserSchema, UserMessage
+from app.schemas.common import Message, Token
 from app.services.free_notification_service import free_notification_service
-from jose import jwt
-from jose.exceptions import JWTError
 import random
 import string
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
-async def get_current_token(token: str = Depends(OAuth2PasswordBearer(tokenUrl="token"))):
-    return token
-
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(get_current_token)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
-
-@router.post("/token")
+@router.post("/token", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Antes da consulta e do bcrypt: tentativa rejeitada não gasta CPU nem banco
+    await rate_limiter.check(request, "login", form_data.username)
+    
+    user = await db.scalar(select(User).where(User.username == form_data.username))
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="CPF/CNPJ ou senha inválidos!",
@@ -55,19 +38,19 @@ async def login(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/register")
+@router.post("/register", response_model=UserMessage)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Verificar se o usuário já existe
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User.id).where(User.username == user_data.username)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="CPF/CNPJ já cadastrado(s) em nosso sistema!"
         )
     
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User.id).where(User.email == user_data.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email já cadastrado em nosso sistema!"
@@ -81,7 +64,7 @@ async def register(
         )
     
     # Criar usuário
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         **user_data.dict(exclude={"password"}),
         hashed_password=hashed_password,
@@ -89,17 +72,21 @@ async def register(
         is_admin=user_data.role == 'admin'
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return {"message": "Cadastro realizado com sucesso!", "user": db_user}
 
-@router.post("/recover-password")
+@router.post("/recover-password", response_model=Message)
 async def recover_password(
+    request: Request,
     username: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == username).first()
+    # Antes de gravar o código e enfileirar email/WhatsApp
+    await rate_limiter.check(request, "recovery", username)
+    
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,32 +97,27 @@ async def recover_password(
     recovery_code = generate_recovery_code()
     user.recovery_code = recovery_code
     user.recovery_code_expires = datetime.utcnow() + timedelta(minutes=30)
-    db.commit()
-    
-    # Enviar código por email e/ou WhatsApp
-    try:
-        # Enviar por email
-        await free_notification_service.send_email(user.email, recovery_code)
-        
-        # Enviar por WhatsApp se disponível
-        if user.whatsapp:
-            await free_notification_service.send_whatsapp(user.whatsapp, recovery_code)
-            
-        return {"message": "Código de recuperação enviado com sucesso!"}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro ao enviar código de recuperação: {str(e)}"
-        )
+    
+    # Enfileirar o código por email e/ou WhatsApp no mesmo commit;
+    # a entrega é feita pelo worker do outbox
+    free_notification_service.enqueue_recovery_code(db, user.email, user.whatsapp, recovery_code)
+    await db.commit()
+    principal_cache.invalidate(user.username)
+    
+    return {"message": "Código de recuperação enviado com sucesso!"}
 
-@router.post("/reset-password")
+@router.post("/reset-password", response_model=Message)
 async def reset_password(
+    request: Request,
     username: str,
     recovery_code: str,
     new_password: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == username).first()
+    # Limita as tentativas de adivinhar o código de 6 dígitos
+    await rate_limiter.check(request, "reset", username)
+    
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -162,33 +144,38 @@ async def reset_password(
         )
     
     # Atualizar senha
-    hashed_password = get_password_hash(new_password)
+    hashed_password = await get_password_hash_async(new_password)
     user.hashed_password = hashed_password
     user.recovery_code = None
     user.recovery_code_expires = None
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(user.username)
     
     return {"message": "Senha alterada com sucesso!"}
 
-@router.get("/me")
+@router.get("/me", response_model=UserSchema)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
-@router.put("/me")
+@router.put("/me", response_model=UserMessage)
 async def update_user(
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
+    # O usuário autenticado vem do cache (desanexado); carregar na sessão atual
+    user = await db.get(User, current_user.id)
+    
     # Atualizar campos do usuário
-    for field, value in user_data.dict(exclude_unset=True).items():
-        setattr(current_user, field, value)
+    for field, value in user_data.dict(exclude_unset=True, exclude={"password"}).items():
+        setattr(user, field, value)
     
     # Se a senha foi atualizada, hash ela
     if user_data.password:
-        current_user.hashed_password = get_password_hash(user_data.password)
+        user.hashed_password = await get_password_hash_async(user_data.password)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.invalidate(user.username)
     
-    return {"message": "Cadastro atualizado com sucesso!", "user": current_user}
+    return {"message": "Cadastro atualizado com sucesso!", "user": user}
@@ -1,103 +1,267 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
+from app.services.uploads import upload_service
+from app.services.image_variants import image_variant_service
+from app.db.pagination import paginate, MAX_PAGE_SIZE
 from app.db.models.boat import Boat
-from app.schemas.boat import BoatCreate, BoatUpdate, Boat
+from app.schemas.boat import BoatCreate, BoatUpdate, Boat as BoatSchema, BoatQuote
+from app.schemas.common import Page, Message, BulkImportReport
 from app.core.security import get_current_user
+from app.core.metrics import query_budget
 from app.db.models.user import User
-from pathlib import Path
-import uuid
+from app.services.availability import booked_during
+from app.services.pricing import pricing_engine
+from app.core.response_cache import response_cache
+from app.services.bulk_import import bulk_importer, BOAT_IMPORT
+from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 
-@router.get("/")
+@router.get("/", response_model=Page[BoatSchema], dependencies=[Depends(query_budget(2))])
 async def read_boats(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
-    boats = db.query(Boat).offset(skip).limit(limit).all()
+    
+    key = ("list", cursor, limit)
+    cached = response_cache.get("boats", key)
+    if cached is None:
+        version = response_cache.version("boats")
+        boats = await paginate(db, select(Boat), cursor=cursor, limit=limit)
+        cached = response_cache.set("boats", key, Page[BoatSchema].model_validate(boats), version)
+    return response_cache.respond(request, cached)
+
+# Ordenações aceitas pela busca: nome -> (coluna, descendente)
+SEARCH_SORTS = {
+    "id": (None, False),
+    "price": (Boat.price_per_day, False),
+    "-price": (Boat.price_per_day, True),
+    "capacity": (Boat.capacity, False),
+    "-capacity": (Boat.capacity, True),
+}
+
+def build_search_query(
+    capacity_min: Optional[int] = None,
+    capacity_max: Optional[int] = None,
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    marina_id: Optional[int] = None,
+    owner_id: Optional[int] = None,
+    available: Optional[bool] = True,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sort: str = "id",
+):
+    """
+    Consulta da busca, antes da paginação: (consulta, order_by, descendente).
+    Também usada por benchmarks/bench_boat_search.py.
+    """
+    # Os filtros casam com os índices parciais ix_boats_available_* (ver migração 2026_10_16_150000):
+    # o predicado precisa ser "is_available" puro, "is_available IS true" não usa o índice
+    query = select(Boat)
+    if available is not None:
+        query = query.where(Boat.is_available if available else ~Boat.is_available)
+    if capacity_min is not None:
+        query = query.where(Boat.capacity >= capacity_min)
+    if capacity_max is not None:
+        query = query.where(Boat.capacity <= capacity_max)
+    if price_min is not None:
+        query = query.where(Boat.price_per_day >= price_min)
+    if price_max is not None:
+        query = query.where(Boat.price_per_day <= price_max)
+    if marina_id is not None:
+        query = query.where(Boat.marina_id == marina_id)
+    if owner_id is not None:
+        query = query.where(Boat.owner_id == owner_id)
+    if start is not None:
+        query = query.where(~booked_during(Boat.id, start, end))
+    
+    column, descending = SEARCH_SORTS[sort]
+    order_by = [Boat.id]
+    if column is not None:
+        # Sem valor não há posição na ordenação (nem no cursor)
+        query = query.where(column.isnot(None))
+        order_by = [column, Boat.id]
+    return query, order_by, descending
+
+@router.get("/search", response_model=Page[BoatSchema], dependencies=[Depends(query_budget(2))])
+async def search_boats(
+    capacity_min: Optional[int] = Query(None, ge=0),
+    capacity_max: Optional[int] = Query(None, ge=0),
+    price_min: Optional[float] = Query(None, ge=0),
+    price_max: Optional[float] = Query(None, ge=0),
+    marina_id: Optional[int] = None,
+    owner_id: Optional[int] = None,
+    available: Optional[bool] = Query(True, description="Filtra por is_available; vazio para todas"),
+    start: Optional[datetime] = Query(None, description="Livre a partir de (requer end)"),
+    end: Optional[datetime] = Query(None, description="Livre até (requer start)"),
+    sort: str = Query("id", description="id, price, -price, capacity ou -capacity"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)
+):
+    if sort not in SEARCH_SORTS:
+        raise HTTPException(status_code=400, detail="Ordenação inválida")
+    if (start is None) != (end is None):
+        raise HTTPException(status_code=400, detail="Informe a data inicial e a final")
+    if start is not None and end <= start:
+        raise HTTPException(status_code=400, detail="A data final deve ser posterior à data inicial")
+    
+    query, order_by, descending = build_search_query(
+        capacity_min, capacity_max, price_min, price_max, marina_id, owner_id, available, start, end, sort
+    )
+    return await paginate(db, query, cursor=cursor, limit=limit, order_by=order_by, descending=descending)
+
+@router.get("/available", response_model=Page[BoatSchema], dependencies=[Depends(query_budget(3))])
+async def read_available_boats(
+    start: datetime,
+    end: datetime,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="A data final deve ser posterior à data inicial")
+    
+    # Sobreposição resolvida no banco, pelo índice GiST das reservas
+    query = select(Boat).where(Boat.is_available, ~booked_during(Boat.id, start, end))
+    boats = await paginate(db, query, cursor=cursor, limit=limit)
     return boats
 
-@router.post("/")
+@router.post("/", response_model=BoatSchema)
 async def create_boat(
     file: UploadFile = File(...),
     boat_data: BoatCreate = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     # Processar upload da imagem
-    filename = f"{uuid.uuid4()}{Path(file.filename).suffix}"
-    file_path = Path(get_settings().UPLOADS_DIR) / filename
-    
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    image_url = await upload_service.save_image(file)
     
     # Criar embarcação
     db_boat = Boat(
-        **boat_data.dict(exclude={"owner_id"}),
-        main_image_url=f"/uploads/{filename}",
+        **boat_data.model_dump(mode="json", exclude={"owner_id", "main_image_url"}),
+        main_image_url=image_url,
         owner_id=current_user.id
     )
     db.add(db_boat)
-    db.commit()
-    db.refresh(db_boat)
+    await db.commit()
+    await db.refresh(db_boat)
+    # As marinas aninham suas embarcações
+    response_cache.invalidate("boats", "marinas")
+    
+    # Gerar thumbnails em segundo plano (as URLs são gravadas ao final)
+    image_variant_service.schedule(image_url, Boat, db_boat.id)
     return db_boat
 
-@router.get("/{boat_id}")
+@router.post("/bulk", response_model=BulkImportReport)
+async def bulk_import_boats(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv ou ndjson (padrão: pelo Content-Type)"),
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    report = await bulk_importer.run(db, request, BOAT_IMPORT, format, all_or_nothing)
+    if report["inserted"]:
+        response_cache.invalidate("boats", "marinas")
+    return report
+
+@router.get("/{boat_id}", response_model=BoatSchema, dependencies=[Depends(query_budget(2))])
 async def read_boat(
     boat_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    if current_user.role != "admin" and current_user.id != boat_data.owner_id:
+    key = ("detail", boat_id)
+    cached = response_cache.get("boats", key)
+    if cached is None:
+        version = response_cache.version("boats")
+        boat = await db.scalar(select(Boat).where(Boat.id == boat_id))
+        if boat is None:
+            raise HTTPException(status_code=404, detail="Embarcação não encontrada")
+        cached = response_cache.set("boats", key, BoatSchema.model_validate(boat), version, meta={"owner_id": boat.owner_id})
+    
+    # A autorização é verificada também nas respostas vindas do cache
+    if current_user.role != "admin" and current_user.id != cached.meta["owner_id"]:
         raise HTTPException(status_code=403, detail="Acesso negado")
+    return response_cache.respond(request, cached)
+
+@router.get("/{boat_id}/quote", response_model=BoatQuote, dependencies=[Depends(query_budget(3))])
+async def read_boat_quote(
+    boat_id: int,
+    start: datetime,
+    end: datetime,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="A data final deve ser posterior à data inicial")
     
-    boat = db.query(Boat).filter(Boat.id == boat_id).first()
+    boat = await db.scalar(select(Boat).where(Boat.id == boat_id))
     if boat is None:
         raise HTTPException(status_code=404, detail="Embarcação não encontrada")
-    return boat
+    
+    return await pricing_engine.quote(db, boat, start, end)
 
-@router.put("/{boat_id}")
+@router.put("/{boat_id}", response_model=BoatSchema)
 async def update_boat(
     boat_id: int,
     boat_data: BoatUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    if current_user.role != "admin" and current_user.id != boat_data.owner_id:
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
-    boat = db.query(Boat).filter(Boat.id == boat_id).first()
+    boat = await db.scalar(select(Boat).where(Boat.id == boat_id))
     if boat is None:
         raise HTTPException(status_code=404, detail="Embarcação não encontrada")
+    if current_user.role != "admin" and current_user.id != boat.owner_id:
+        raise HTTPException(status_code=403, detail="Acesso negado")
     
-    for key, value in boat_data.dict(exclude_unset=True).items():
+    update_data = boat_data.model_dump(mode="json", exclude_unset=True)
+    for key, value in update_data.items():
         setattr(boat, key, value)
     
-    db.commit()
-    db.refresh(boat)
+    # A imagem principal mudou: as variantes anteriores não valem mais
+    if "main_image_url" in update_data:
+        boat.image_variants = None
+    
+    await db.commit()
+    await db.refresh(boat)
+    response_cache.invalidate("boats", "marinas")
+    if "main_image_url" in update_data:
+        image_variant_service.schedule(boat.main_image_url, Boat, boat.id)
     return boat
 
-@router.delete("/{boat_id}")
+@router.delete("/{boat_id}", response_model=Message)
 async def delete_boat(
     boat_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    if current_user.role != "admin" and current_user.id != boat_data.owner_id:
-        raise HTTPException(status_code=403, detail="Acesso negado")
-    
-    boat = db.query(Boat).filter(Boat.id == boat_id).first()
+    boat = await db.scalar(select(Boat).where(Boat.id == boat_id))
     if boat is None:
         raise HTTPException(status_code=404, detail="Embarcação não encontrada")
+    if current_user.role != "admin" and current_user.id != boat.owner_id:
+        raise HTTPException(status_code=403, detail="Acesso negado")
     
-    db.delete(boat)
-    db.commit()
+    await db.delete(boat)
+    await db.commit()
+    response_cache.invalidate("boats", "marinas")
     return {"message": "Embarcação excluída com sucesso"}
@@ -1,85 +1,158 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
+from app.db.pagination import paginate, MAX_PAGE_SIZE
+from app.db.loaders import with_profile, get_with_profile
 from app.db.models.booking import Booking
-from app.schemas.booking import BookingCreate, BookingUpdate, Booking
+from app.db.models.boat import Boat
+from app.schemas.booking import BookingCreate, BookingUpdate, Booking as BookingSchema
+from app.schemas.common import Page
 from app.core.security import get_current_user
+from app.core.metrics import query_budget
 from app.db.models.user import User
+from app.services.availability import availability_index, naive_utc, INACTIVE_STATUSES
+from app.services.pricing import pricing_engine
+from app.services.exports import export_service
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 
-@router.get("/")
+@router.get("/", response_model=Page[BookingSchema], dependencies=[Depends(query_budget(4))])
 async def read_bookings(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)
 ):
     if current_user.role != "admin":
-        bookings = db.query(Booking).filter(Booking.user_id == current_user.id).offset(skip).limit(limit).all()
+        bookings = await paginate(db, with_profile(select(Booking).where(Booking.user_id == current_user.id), "booking_list"), cursor=cursor, limit=limit)
     else:
-        bookings = db.query(Booking).offset(skip).limit(limit).all()
+        bookings = await paginate(db, with_profile(select(Booking), "booking_list"), cursor=cursor, limit=limit)
     return bookings
 
-@router.post("/")
+# Colunas exportadas, na ordem do CSV
+EXPORT_COLUMNS = (
+    Booking.id, Booking.user_id, Booking.boat_id, Booking.start_date, Booking.end_date,
+    Booking.total_price, Booking.status, Booking.created_at, Booking.updated_at,
+)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_bookings(
+    format: str = Query("csv", description="csv ou ndjson"),
+    date_from: Optional[datetime] = Query(None, description="Reservas com início a partir desta data"),
+    date_to: Optional[datetime] = Query(None, description="Reservas com início antes desta data"),
+    current_user: User = Depends(get_current_user)
+):
+    query = select(*EXPORT_COLUMNS).order_by(Booking.id)
+    if current_user.role != "admin":
+        query = query.where(Booking.user_id == current_user.id)
+    if date_from is not None:
+        query = query.where(Booking.start_date >= naive_utc(date_from))
+    if date_to is not None:
+        query = query.where(Booking.start_date < naive_utc(date_to))
+    return export_service.response(query, [c.key for c in EXPORT_COLUMNS], format, "bookings")
+
+@router.post("/", response_model=BookingSchema)
 async def create_booking(
     booking_data: BookingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    # Colunas sem timezone: o asyncpg rejeita datas com timezone
+    start_date, end_date = naive_utc(booking_data.start_date), naive_utc(booking_data.end_date)
+    
     # Verificar disponibilidade do barco
-    boat = db.query(Boat).filter(Boat.id == booking_data.boat_id).first()
+    boat = await db.scalar(select(Boat).where(Boat.id == booking_data.boat_id))
     if not boat:
         raise HTTPException(status_code=404, detail="Embarcação não encontrada")
     if not boat.is_available:
         raise HTTPException(status_code=400, detail="Embarcação não está disponível")
     
-    # Calcular preço total
-    days = (booking_data.end_date - booking_data.start_date).days
-    total_price = days * boat.price_per_day
+    if end_date <= start_date:
+        raise HTTPException(status_code=400, detail="A data final deve ser posterior à data inicial")
+    
+    # Verificar conflito com outras reservas no mesmo período
+    await availability_index.ensure_loaded(db)
+    if not availability_index.is_free(boat.id, start_date, end_date):
+        raise HTTPException(status_code=409, detail="Embarcação já reservada para o período informado")
+    
+    # Calcular preço total (faixas de preço do parceiro + preço base)
+    quote = await pricing_engine.quote(db, boat, start_date, end_date)
+    total_price = quote["total_price"]
     
     # Criar reserva
     db_booking = Booking(
-        **booking_data.dict(),
+        boat_id=booking_data.boat_id,
+        start_date=start_date,
+        end_date=end_date,
         user_id=current_user.id,
         total_price=total_price,
         status="pending"
     )
     db.add(db_booking)
-    db.commit()
-    db.refresh(db_booking)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Exclusion constraint: reserva concorrente (possivelmente de outro worker)
+        await db.rollback()
+        availability_index.invalidate()
+        raise HTTPException(status_code=409, detail="Embarcação já reservada para o período informado")
+    db_booking = await get_with_profile(db, Booking, db_booking.id, "booking_detail")
+    availability_index.add(db_booking)
     return db_booking
 
-@router.put("/{booking_id}/status")
+@router.put("/{booking_id}/status", response_model=BookingSchema)
 async def update_booking_status(
     booking_id: int,
     status: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await db.scalar(select(Booking).where(Booking.id == booking_id))
     if not booking:
         raise HTTPException(status_code=404, detail="Reserva não encontrada")
     
     if status not in ["pending", "confirmed", "cancelled", "completed"]:
         raise HTTPException(status_code=400, detail="Status inválido")
     
+    was_active = booking.status not in INACTIVE_STATUSES
+    is_active = status not in INACTIVE_STATUSES
+    
+    # Reativar uma reserva cancelada exige que o período ainda esteja livre
+    if is_active and not was_active:
+        await availability_index.ensure_loaded(db)
+        if not availability_index.is_free(booking.boat_id, booking.start_date, booking.end_date):
+            raise HTTPException(status_code=409, detail="Embarcação já reservada para o período informado")
+    
     booking.status = status
-    db.commit()
-    db.refresh(booking)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        availability_index.invalidate()
+        raise HTTPException(status_code=409, detail="Embarcação já reservada para o período informado")
+    booking = await get_with_profile(db, Booking, booking.id, "booking_detail")
+    
+    if was_active and not is_active:
+        availability_index.remove(booking)
+    elif is_active and not was_active:
+        availability_index.add(booking)
     return booking
 
-@router.delete("/{booking_id}")
+@router.delete("/{booking_id}", response_model=BookingSchema)
 async def cancel_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await db.scalar(select(Booking).where(Booking.id == booking_id))
     if not booking:
         raise HTTPException(status_code=404, detail="Reserva não encontrada")
     
@@ -90,6 +163,7 @@ async def cancel_booking(
         raise HTTPException(status_code=400, detail="Não é possível cancelar uma reserva concluída")
     
     booking.status = "cancelled"
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    booking = await get_with_profile(db, Booking, booking.id, "booking_detail")
+    availability_index.remove(booking)
     return booking
@@ -1,102 +1,200 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
+from app.services.uploads import upload_service
+from app.services.image_variants import image_variant_service
+from app.db.pagination import paginate, MAX_PAGE_SIZE
+from app.db.loaders import with_profile, get_with_profile
 from app.db.models.marina import Marina
-from app.schemas.marina import MarinaCreate, MarinaUpdate, Marina
+from app.schemas.marina import MarinaCreate, MarinaUpdate, Marina as MarinaSchema, MarinaDistance
+from app.schemas.common import Page, Message, BulkImportReport
 from app.core.security import get_current_user
+from app.core.metrics import query_budget
 from app.db.models.user import User
-from pathlib import Path
-import uuid
+from app.core.config import get_settings
+from app.core.response_cache import response_cache
+from app.services.bulk_import import bulk_importer, MARINA_IMPORT
+from app.services.marina_geo_index import marina_geo_index, bounding_box, haversine_km
+from typing import List, Optional
 
 router = APIRouter()
 
-@router.get("/")
+@router.get("/", response_model=Page[MarinaSchema], dependencies=[Depends(query_budget(3))])
 async def read_marinas(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    services: Optional[List[str]] = Query(None, description="Marinas que oferecem todos os serviços informados")
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
-    marinas = db.query(Marina).offset(skip).limit(limit).all()
-    return marinas
+    
+    services = sorted(set(services)) if services else None
+    key = ("list", cursor, limit, tuple(services or ()))
+    cached = response_cache.get("marinas", key)
+    if cached is None:
+        version = response_cache.version("marinas")
+        query = with_profile(select(Marina), "marina_list")
+        if services:
+            # services @> '[...]' usa o índice GIN ix_marinas_services
+            query = query.where(Marina.services.contains(services))
+        marinas = await paginate(db, query, cursor=cursor, limit=limit)
+        cached = response_cache.set("marinas", key, Page[MarinaSchema].model_validate(marinas), version)
+    return response_cache.respond(request, cached)
+
+@router.get("/nearby", response_model=List[MarinaDistance], dependencies=[Depends(query_budget(4))])
+async def read_nearby_marinas(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(50, gt=0, le=2000),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if get_settings().MARINA_GEO_INDEX_ENABLED:
+        # Índice em memória: apenas as células próximas são avaliadas
+        await marina_geo_index.ensure_loaded(db)
+        nearest = marina_geo_index.nearby(lat, lon, radius_km, limit)
+        marinas = {}
+        if nearest:
+            ids = [marina_id for _, marina_id in nearest]
+            marinas = {m.id: m for m in (await db.scalars(with_profile(select(Marina).where(Marina.id.in_(ids)), "marina_list"))).all()}
+        results = [
+            {"distance_km": round(distance, 3), "marina": marinas[marina_id]}
+            for distance, marina_id in nearest
+            if marina_id in marinas
+        ]
+    else:
+        # Fallback no banco: pré-filtro pelo retângulo envolvente, distância exata em seguida
+        lat_min, lat_max, lon_min, lon_max = bounding_box(lat, lon, radius_km)
+        query = with_profile(select(Marina), "marina_list").where(Marina.latitude.between(lat_min, lat_max))
+        if lon_min >= -180 and lon_max <= 180:
+            query = query.where(Marina.longitude.between(lon_min, lon_max))
+        results = []
+        for marina in (await db.scalars(query)).all():
+            if marina.latitude is None or marina.longitude is None:
+                continue
+            distance = haversine_km(lat, lon, marina.latitude, marina.longitude)
+            if distance <= radius_km:
+                results.append({"distance_km": round(distance, 3), "marina": marina})
+        results.sort(key=lambda r: r["distance_km"])
+        results = results[:limit]
+    
+    return results
 
-@router.post("/")
+@router.post("/", response_model=MarinaSchema)
 async def create_marina(
     file: UploadFile = File(...),
     marina_data: MarinaCreate = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     # Processar upload da imagem
-    filename = f"{uuid.uuid4()}{Path(file.filename).suffix}"
-    file_path = Path(get_settings().UPLOADS_DIR) / filename
-    
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    image_url = await upload_service.save_image(file)
     
     # Criar marina
     db_marina = Marina(
-        **marina_data.dict(),
-        main_image_url=f"/uploads/{filename}"
+        **marina_data.model_dump(mode="json", exclude={"main_image_url"}),
+        main_image_url=image_url
     )
     db.add(db_marina)
-    db.commit()
-    db.refresh(db_marina)
+    await db.commit()
+    db_marina = await get_with_profile(db, Marina, db_marina.id, "marina_detail")
+    
+    # Gerar thumbnails em segundo plano (as URLs são gravadas ao final)
+    image_variant_service.schedule(image_url, Marina, db_marina.id)
+    marina_geo_index.upsert(db_marina)
+    response_cache.invalidate("marinas")
     return db_marina
 
-@router.get("/{marina_id}")
+@router.post("/bulk", response_model=BulkImportReport)
+async def bulk_import_marinas(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv ou ndjson (padrão: pelo Content-Type)"),
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    report = await bulk_importer.run(db, request, MARINA_IMPORT, format, all_or_nothing)
+    if report["inserted"]:
+        response_cache.invalidate("marinas")
+        marina_geo_index.invalidate()
+    return report
+
+@router.get("/{marina_id}", response_model=MarinaSchema, dependencies=[Depends(query_budget(3))])
 async def read_marina(
     marina_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    marina = db.query(Marina).filter(Marina.id == marina_id).first()
-    if marina is None:
-        raise HTTPException(status_code=404, detail="Marina não encontrada")
-    return marina
+    key = ("detail", marina_id)
+    cached = response_cache.get("marinas", key)
+    if cached is None:
+        version = response_cache.version("marinas")
+        marina = await db.scalar(with_profile(select(Marina).where(Marina.id == marina_id), "marina_detail"))
+        if marina is None:
+            raise HTTPException(status_code=404, detail="Marina não encontrada")
+        cached = response_cache.set("marinas", key, MarinaSchema.model_validate(marina), version)
+    return response_cache.respond(request, cached)
 
-@router.put("/{marina_id}")
+@router.put("/{marina_id}", response_model=MarinaSchema)
 async def update_marina(
     marina_id: int,
     marina_data: MarinaUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    marina = db.query(Marina).filter(Marina.id == marina_id).first()
+    marina = await db.scalar(select(Marina).where(Marina.id == marina_id))
     if marina is None:
         raise HTTPException(status_code=404, detail="Marina não encontrada")
     
-    for key, value in marina_data.dict(exclude_unset=True).items():
+    update_data = marina_data.model_dump(mode="json", exclude_unset=True)
+    for key, value in update_data.items():
         setattr(marina, key, value)
     
-    db.commit()
-    db.refresh(marina)
+    # A imagem principal mudou: as variantes anteriores não valem mais
+    if "main_image_url" in update_data:
+        marina.image_variants = None
+    
+    await db.commit()
+    marina = await get_with_profile(db, Marina, marina.id, "marina_detail")
+    marina_geo_index.upsert(marina)
+    response_cache.invalidate("marinas")
+    if "main_image_url" in update_data:
+        image_variant_service.schedule(marina.main_image_url, Marina, marina.id)
     return marina
 
-@router.delete("/{marina_id}")
+@router.delete("/{marina_id}", response_model=Message)
 async def delete_marina(
     marina_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    marina = db.query(Marina).filter(Marina.id == marina_id).first()
+    marina = await db.scalar(select(Marina).where(Marina.id == marina_id))
     if marina is None:
         raise HTTPException(status_code=404, detail="Marina não encontrada")
     
-    db.delete(marina)
-    db.commit()
+    await db.delete(marina)
+    await db.commit()
+    marina_geo_index.remove(marina_id)
+    response_cache.invalidate("marinas")
     return {"message": "Marina excluída com sucesso"}
@@ -1,30 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
+from app.db.pagination import paginate, MAX_PAGE_SIZE
+from app.db.loaders import with_profile, get_with_profile
 from app.db.models.partner_price import PartnerPrice
-from app.schemas.partner_price import PartnerPriceCreate, PartnerPriceUpdate, PartnerPrice
+from app.db.models.boat import Boat
+from app.schemas.partner_price import PartnerPriceCreate, PartnerPriceUpdate, PartnerPrice as PartnerPriceSchema
+from app.schemas.common import Page, Message, BulkImportReport
 from app.core.security import get_current_user
+from app.core.metrics import query_budget
 from app.db.models.user import User
+from app.services.pricing import pricing_engine
+from app.services.availability import naive_utc
+from app.services.bulk_import import bulk_importer, PARTNER_PRICE_IMPORT
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 
-@router.get("/")
+@router.get("/", response_model=Page[PartnerPriceSchema], dependencies=[Depends(query_budget(4))])
 async def read_partner_prices(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
-    partner_prices = db.query(PartnerPrice).offset(skip).limit(limit).all()
+    partner_prices = await paginate(db, with_profile(select(PartnerPrice), "partner_price_list"), cursor=cursor, limit=limit)
     return partner_prices
 
-@router.post("/")
+@router.post("/", response_model=PartnerPriceSchema)
 async def create_partner_price(
     price_data: PartnerPriceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin" and current_user.role != "parceiro":
@@ -35,29 +45,58 @@ async def create_partner_price(
         raise HTTPException(status_code=403, detail="Não é permitido criar preços para outros parceiros")
     
     # Verificar se o barco existe
-    boat = db.query(Boat).filter(Boat.id == price_data.boat_id).first()
+    boat = await db.scalar(select(Boat).where(Boat.id == price_data.boat_id))
     if not boat:
         raise HTTPException(status_code=404, detail="Embarcação não encontrada")
     
+    # Colunas sem timezone: o asyncpg rejeita datas com timezone
     db_price = PartnerPrice(
-        **price_data.dict()
+        **price_data.dict(exclude={"start_date", "end_date"}),
+        start_date=naive_utc(price_data.start_date),
+        end_date=naive_utc(price_data.end_date)
     )
     db.add(db_price)
-    db.commit()
-    db.refresh(db_price)
+    await db.commit()
+    db_price = await get_with_profile(db, PartnerPrice, db_price.id, "partner_price_detail")
+    pricing_engine.invalidate(db_price.boat_id)
     return db_price
 
-@router.put("/{price_id}")
+@router.post("/bulk", response_model=BulkImportReport)
+async def bulk_import_partner_prices(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv ou ndjson (padrão: pelo Content-Type)"),
+    all_or_nothing: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin" and current_user.role != "parceiro":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    def authorize(item):
+        # Mesmas regras do cadastro individual, aplicadas linha a linha
+        if current_user.role == "parceiro" and item.partner_id != current_user.id:
+            return "Não é permitido criar preços para outros parceiros"
+        # Datas com e sem fuso na mesma linha: compara ambas em UTC
+        if naive_utc(item.end_date) <= naive_utc(item.start_date):
+            return "A data final deve ser posterior à data inicial"
+        return None
+    
+    report = await bulk_importer.run(db, request, PARTNER_PRICE_IMPORT, format, all_or_nothing, authorize)
+    if report["inserted"]:
+        pricing_engine.clear()
+    return report
+
+@router.put("/{price_id}", response_model=PartnerPriceSchema)
 async def update_partner_price(
     price_id: int,
     price_data: PartnerPriceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin" and current_user.role != "parceiro":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    price = db.query(PartnerPrice).filter(PartnerPrice.id == price_id).first()
+    price = await db.scalar(select(PartnerPrice).where(PartnerPrice.id == price_id))
     if not price:
         raise HTTPException(status_code=404, detail="Preço não encontrado")
     
@@ -73,23 +112,28 @@ async def update_partner_price(
         if price_data.boat_id and price_data.boat_id != price.boat_id:
             raise HTTPException(status_code=403, detail="Não é permitido alterar a embarcação associada")
     
+    previous_boat_id = price.boat_id
     for key, value in price_data.dict(exclude_unset=True).items():
+        if key in ("start_date", "end_date") and value is not None:
+            value = naive_utc(value)
         setattr(price, key, value)
     
-    db.commit()
-    db.refresh(price)
+    await db.commit()
+    price = await get_with_profile(db, PartnerPrice, price.id, "partner_price_detail")
+    pricing_engine.invalidate(previous_boat_id)
+    pricing_engine.invalidate(price.boat_id)
     return price
 
-@router.delete("/{price_id}")
+@router.delete("/{price_id}", response_model=Message)
 async def delete_partner_price(
     price_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin" and current_user.role != "parceiro":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    price = db.query(PartnerPrice).filter(PartnerPrice.id == price_id).first()
+    price = await db.scalar(select(PartnerPrice).where(PartnerPrice.id == price_id))
     if not price:
         raise HTTPException(status_code=404, detail="Preço não encontrado")
     
@@ -97,6 +141,7 @@ async def delete_partner_price(
     if current_user.role == "parceiro" and price.partner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Não é permitido excluir preços de outros parceiros")
     
-    db.delete(price)
-    db.commit()
+    await db.delete(price)
+    await db.commit()
+    pricing_engine.invalidate(price.boat_id)
     return {"message": "Preço excluído com sucesso"}
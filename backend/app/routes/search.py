@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db
+from app.schemas.common import Page
+from app.schemas.search import SearchResult
+from app.core.security import get_current_user
+from app.core.metrics import query_budget
+from app.db.models.user import User
+from app.services.search import search
+from typing import Optional
+
+router = APIRouter()
+
+@router.get("/search", response_model=Page[SearchResult], dependencies=[Depends(query_budget(2))])
+async def search_catalog(
+    q: str = Query(..., min_length=1, max_length=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    return await search(db, q, cursor=cursor, limit=limit)
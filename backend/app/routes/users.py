@@ -1,108 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
+from app.services.uploads import upload_service
+from app.db.pagination import paginate, MAX_PAGE_SIZE
 from app.db.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, User
-from app.core.security import get_current_user
+from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
+from app.schemas.common import Page, Message
+from app.core.security import get_current_user, get_password_hash_async
+from app.core.metrics import query_budget
+from app.core.principal_cache import principal_cache
 from app.core.config import get_settings
-from pathlib import Path
-import uuid
+from app.services.exports import export_service
+from app.services.availability import naive_utc
+from datetime import datetime
+from typing import Optional
 
 settings = get_settings()
 router = APIRouter()
 
-@router.get("/")
+@router.get("/", response_model=Page[UserSchema], dependencies=[Depends(query_budget(2))])
 async def read_users(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
-    users = db.query(User).offset(skip).limit(limit).all()
+    users = await paginate(db, select(User), cursor=cursor, limit=limit)
     return users
 
-@router.post("/")
+# Colunas exportadas, na ordem do CSV (sem senha nem código de recuperação)
+EXPORT_COLUMNS = (
+    User.id, User.username, User.email, User.full_name, User.role, User.phone, User.whatsapp,
+    User.birth_date, User.is_active, User.is_admin, User.cep, User.address, User.created_at, User.updated_at,
+)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    format: str = Query("csv", description="csv ou ndjson"),
+    date_from: Optional[datetime] = Query(None, description="Usuários cadastrados a partir desta data"),
+    date_to: Optional[datetime] = Query(None, description="Usuários cadastrados antes desta data"),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    query = select(*EXPORT_COLUMNS).order_by(User.id)
+    if date_from is not None:
+        query = query.where(User.created_at >= naive_utc(date_from))
+    if date_to is not None:
+        query = query.where(User.created_at < naive_utc(date_to))
+    return export_service.response(query, [c.key for c in EXPORT_COLUMNS], format, "users")
+
+@router.post("/", response_model=UserSchema)
 async def create_user(
     file: UploadFile = File(...),
     user_data: UserCreate = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     # Processar upload da imagem
-    filename = f"{uuid.uuid4()}{Path(file.filename).suffix}"
-    file_path = Path(settings.UPLOADS_DIR) / filename
-    
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    image_url = await upload_service.save_image(file)
     
     # Criar usuário
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
-        **user_data.dict(exclude={"password"}),
+        **user_data.dict(exclude={"password", "photo_url"}),
         hashed_password=hashed_password,
-        photo_url=f"/uploads/{filename}"
+        photo_url=image_url
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
-@router.get("/{user_id}")
+@router.get("/{user_id}", response_model=UserSchema, dependencies=[Depends(query_budget(2))])
 async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin" and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     return user
 
-@router.put("/{user_id}")
+@router.put("/{user_id}", response_model=UserSchema)
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin" and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
     for key, value in user_data.dict(exclude_unset=True).items():
         if key == "password":
-            setattr(user, "hashed_password", get_password_hash(value))
+            setattr(user, "hashed_password", await get_password_hash_async(value))
         else:
             setattr(user, key, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.invalidate(user.username)
     return user
 
-@router.delete("/{user_id}")
+@router.delete("/{user_id}", response_model=Message)
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    principal_cache.invalidate(user.username)
     return {"message": "Usuário excluído com sucesso"}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class BoatBase(BaseModel):
@@ -26,8 +26,28 @@ class BoatUpdate(BoatBase):
 class Boat(BoatBase):
     id: int
     owner_id: int
-    created_at: datetime
-    updated_at: datetime
+    marina_id: Optional[int] = None
+    # Imagens enviadas são servidas por caminho relativo (/uploads/...), não URL absoluta
+    main_image_url: Optional[str] = None
+    gallery_images: Optional[List[str]] = None
+    image_variants: Optional[Dict[str, str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class PriceBreakdownItem(BaseModel):
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    days: int
+    price_per_day: Optional[float] = None
+    source: str
+
+class BoatQuote(BaseModel):
+    boat_id: int
+    start: datetime
+    end: datetime
+    days: int
+    total_price: float
+    breakdown: List[PriceBreakdownItem]
@@ -21,10 +21,12 @@ class BookingUpdate(BookingBase):
 
 class Booking(BookingBase):
     id: int
+    user_id: int
+    boat_id: int
     user: User
     boat: Boat
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+class Message(BaseModel):
+    message: str
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+
+class BulkRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class BulkImportReport(BaseModel):
+    format: str
+    received: int
+    inserted: int
+    error_count: int
+    errors: List[BulkRowError]
+    errors_truncated: bool = False
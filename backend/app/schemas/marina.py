@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from app.schemas.boat import Boat
 
@@ -32,9 +32,22 @@ class MarinaUpdate(MarinaBase):
 
 class Marina(MarinaBase):
     id: int
-    boats: List[Boat]
-    created_at: datetime
-    updated_at: datetime
+    # Colunas opcionais no banco (marinas importadas/cadastradas sem todos os dados)
+    description: Optional[str] = None
+    address: Optional[str] = None
+    contact_phone: Optional[str] = None
+    contact_email: Optional[str] = None
+    services: Optional[List[str]] = None
+    main_image_url: Optional[str] = None
+    gallery_images: Optional[List[str]] = None
+    image_variants: Optional[Dict[str, str]] = None
+    boats: List[Boat] = []
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class MarinaDistance(BaseModel):
+    distance_km: float
+    marina: Marina
@@ -20,10 +20,12 @@ class PartnerPriceUpdate(PartnerPriceBase):
 
 class PartnerPrice(PartnerPriceBase):
     id: int
+    partner_id: int
+    boat_id: int
     partner: User
     boat: Boat
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional, Dict
+
+class SearchResult(BaseModel):
+    type: str  # boat, marina
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    main_image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None
+    rank: float
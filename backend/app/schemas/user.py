@@ -1,11 +1,57 @@
 from pydantic import BaseModel, EmailStr, validator, Field
 from typing import Optional
 from datetime import datetime, date
-import re
 from app.core.config import get_settings
 
 settings = get_settings()
 
+USER_ROLES = frozenset(("cliente", "parceiro", "admin"))
+PASSWORD_SPECIAL_CHARS = frozenset('!@#$%^&*(),.?":{}|<>')
+PASSWORD_MIN_LENGTH = 8
+
+
+def check_cpf_cnpj(v: str) -> str:
+    # CPF (11) ou CNPJ (14) apenas com dígitos ASCII
+    if len(v) not in (11, 14) or not (v.isascii() and v.isdigit()):
+        raise ValueError('CPF/CNPJ inválido')
+    return v
+
+
+def check_password(v: Optional[str]) -> Optional[str]:
+    """
+    Regras de senha forte numa única passada pela string (com saída
+    antecipada quando todas as classes de caracteres já apareceram). As
+    mensagens seguem a ordem das regras: tamanho, maiúscula, minúscula,
+    número e caractere especial.
+    """
+    if not v:
+        return v
+    if len(v) < PASSWORD_MIN_LENGTH:
+        raise ValueError('A senha deve ter no mínimo 8 caracteres')
+
+    upper = lower = digit = special = False
+    for c in v:
+        if c.isupper():
+            upper = True
+        elif c.islower():
+            lower = True
+        elif c.isdigit():
+            digit = True
+        elif c in PASSWORD_SPECIAL_CHARS:
+            special = True
+        else:
+            continue
+        if upper and lower and digit and special:
+            return v
+
+    if not upper:
+        raise ValueError('A senha deve conter pelo menos 1 caractere maiúsculo')
+    if not lower:
+        raise ValueError('A senha deve conter pelo menos 1 caractere minúsculo')
+    if not digit:
+        raise ValueError('A senha deve conter pelo menos 1 número')
+    raise ValueError('A senha deve conter pelo menos 1 caractere especial')
+
 class UserBase(BaseModel):
     username: str = Field(..., description="CPF/CNPJ")
     email: EmailStr
@@ -16,16 +62,11 @@ class UserBase(BaseModel):
     birth_date: Optional[date] = None
     photo_url: str
 
-    @validator('username')
-    def validate_cpf_cnpj(cls, v):
-        # Basic validation for CPF/CNPJ format
-        if not re.match(r'^\d{11}$|^\d{14}$', v):
-            raise ValueError('CPF/CNPJ inválido')
-        return v
+    validate_cpf_cnpj = validator('username', allow_reuse=True)(check_cpf_cnpj)
 
     @validator('role')
     def validate_role(cls, v):
-        if v not in ['cliente', 'parceiro', 'admin']:
+        if v not in USER_ROLES:
             raise ValueError('Tipo de usuário inválido')
         return v
 
@@ -34,27 +75,7 @@ class UserCreate(UserBase):
     cep: str
     address: str
 
-    @validator('password')
-    def validate_password(cls, v):
-        if not v:
-            return v
-        
-        if len(v) < 8:
-            raise ValueError('A senha deve ter no mínimo 8 caracteres')
-        
-        if not any(c.isupper() for c in v):
-            raise ValueError('A senha deve conter pelo menos 1 caractere maiúsculo')
-        
-        if not any(c.islower() for c in v):
-            raise ValueError('A senha deve conter pelo menos 1 caractere minúsculo')
-        
-        if not any(c.isdigit() for c in v):
-            raise ValueError('A senha deve conter pelo menos 1 número')
-        
-        if not re.search('[!@#$%^&*(),.?":{}|<>]', v):
-            raise ValueError('A senha deve conter pelo menos 1 caractere especial')
-        
-        return v
+    validate_password = validator('password', allow_reuse=True)(check_password)
 
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
@@ -68,34 +89,21 @@ class UserUpdate(BaseModel):
     address: Optional[str] = None
     password: Optional[str] = None
 
-    @validator('password')
-    def validate_password(cls, v):
-        if not v:
-            return v
-        
-        if len(v) < 8:
-            raise ValueError('A senha deve ter no mínimo 8 caracteres')
-        
-        if not any(c.isupper() for c in v):
-            raise ValueError('A senha deve conter pelo menos 1 caractere maiúsculo')
-        
-        if not any(c.islower() for c in v):
-            raise ValueError('A senha deve conter pelo menos 1 caractere minúsculo')
-        
-        if not any(c.isdigit() for c in v):
-            raise ValueError('A senha deve conter pelo menos 1 número')
-        
-        if not re.search('[!@#$%^&*(),.?":{}|<>]', v):
-            raise ValueError('A senha deve conter pelo menos 1 caractere especial')
-        
-        return v
+    validate_password = validator('password', allow_reuse=True)(check_password)
 
 class User(UserBase):
     id: int
+    # Já validado na escrita; revalidar EmailStr a cada linha serializada domina o custo das listas
+    email: str
+    photo_url: Optional[str] = None
     is_active: bool
     is_admin: bool
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class UserMessage(BaseModel):
+    message: str
+    user: User
@@ -0,0 +1,228 @@
+from sqlalchemy import select, exists, func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.booking import Booking
+from app.core.config import get_settings
+from bisect import bisect_left
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Reservas com estes status não ocupam a embarcação
+INACTIVE_STATUSES = {"cancelled"}
+
+# Mesmas expressões da exclusion constraint bookings_no_overlap. Os literais
+# vão no SQL (e não como parâmetros) para o planner casar a expressão e o
+# predicado do índice GiST também em planos genéricos.
+BOOKING_PERIOD = func.tsrange(Booking.start_date, Booking.end_date, literal_column("'[)'"))
+ACTIVE_BOOKING = Booking.status.is_distinct_from(literal_column("'cancelled'"))
+
+
+def naive_utc(value: datetime) -> datetime:
+    """As colunas são DateTime sem timezone; normaliza datas com timezone para UTC."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def booked_during(boat_id, start: datetime, end: datetime):
+    """
+    Condição SQL: a embarcação `boat_id` (coluna ou valor) tem reserva ativa
+    sobreposta a [start, end).
+
+    Usada pelas buscas de embarcações livres como NOT EXISTS: o banco
+    resolve a sobreposição pelo índice GiST (boat_id, tsrange) da
+    constraint, sem percorrer todas as agendas nem enviar a lista de
+    embarcações ocupadas na consulta.
+    """
+    period = func.tsrange(naive_utc(start), naive_utc(end), literal_column("'[)'"))
+    return exists().where(
+        Booking.boat_id == boat_id,
+        ACTIVE_BOOKING,
+        BOOKING_PERIOD.op("&&")(period),
+    )
+
+
+class BoatSchedule:
+    """
+    Intervalos [início, fim) das reservas ativas de uma embarcação,
+    ordenados pelo início.
+
+    Mantém também o maior "fim" acumulado até cada posição, de modo que a
+    verificação de sobreposição é uma busca binária mesmo que existam
+    reservas antigas sobrepostas entre si. O acumulado é atualizado junto
+    com a lista em add/remove, sem reconstrução na consulta.
+    """
+
+    def __init__(self):
+        self._intervals = []  # (start, end, booking_id)
+        self._max_end = []
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def add(self, start: datetime, end: datetime, booking_id: int):
+        i = bisect_left(self._intervals, (start, end, booking_id))
+        self._intervals.insert(i, (start, end, booking_id))
+        previous = self._max_end[i - 1] if i else None
+        self._max_end.insert(i, end if previous is None or end > previous else previous)
+        # O acumulado é não decrescente: só as posições seguintes menores que `end` mudam
+        for j in range(i + 1, len(self._max_end)):
+            if self._max_end[j] >= end:
+                break
+            self._max_end[j] = end
+
+    def remove(self, booking_id: int):
+        for i, interval in enumerate(self._intervals):
+            if interval[2] == booking_id:
+                break
+        else:
+            return
+        del self._intervals[i]
+        del self._max_end[i]
+        # Recalcula o acumulado a partir da posição removida
+        current = self._max_end[i - 1] if i else None
+        for j in range(i, len(self._intervals)):
+            end = self._intervals[j][1]
+            current = end if current is None or end > current else current
+            self._max_end[j] = current
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        # Intervalos com início < end ficam antes da posição i;
+        # basta saber se algum deles termina depois de start.
+        i = bisect_left(self._intervals, (end,))
+        if i == 0:
+            return False
+        return self._max_end[i - 1] > start
+
+
+class AvailabilityIndex:
+    """
+    Índice em memória da ocupação das embarcações, usado na verificação
+    de uma embarcação específica (criação e reativação de reservas); a
+    busca por embarcações livres fica no banco (booked_during).
+
+    Guarda apenas as reservas ativas que ainda não terminaram. É carregado
+    na primeira consulta e recarregado em segundo plano a cada
+    AVAILABILITY_INDEX_REFRESH_SECONDS (start() no lifespan), para refletir
+    reservas criadas por outros workers sem bloquear as requisições; entre
+    as recargas, é atualizado incrementalmente nas rotas de reserva. Sem a
+    tarefa de segundo plano (scripts fora do lifespan), a recarga acontece
+    na própria requisição. A garantia final contra sobreposição é a
+    exclusion constraint da tabela bookings.
+    """
+
+    def __init__(self, refresh_seconds: int = 60):
+        self.refresh_seconds = refresh_seconds
+        self._schedules = {}
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+        self._refresh_requested = asyncio.Event()
+        self._task = None
+
+    def invalidate(self):
+        """Pede uma recarga antecipada (ex.: conflito detectado pela constraint)."""
+        if self._task is not None:
+            self._refresh_requested.set()
+        else:
+            self._loaded_at = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        # Importado aqui: app.db.base importa os modelos, que dependem dos serviços
+        from app.db.base import AsyncSessionLocal
+
+        while True:
+            try:
+                async with self._lock:
+                    async with AsyncSessionLocal() as db:
+                        await self._rebuild(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro ao recarregar o índice de disponibilidade")
+            self._refresh_requested.clear()
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            await self._rebuild(db)
+
+    def _is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        # Com a tarefa de segundo plano, um índice já carregado nunca é recarregado na requisição
+        return self._task is not None or time.monotonic() - self._loaded_at < self.refresh_seconds
+
+    async def _rebuild(self, db: AsyncSession):
+        start = time.perf_counter()
+        # Reservas já encerradas não conflitam com novos períodos; uma reserva
+        # no passado que as sobreponha ainda é barrada pela constraint
+        now = naive_utc(datetime.now(timezone.utc))
+        result = await db.execute(
+            select(Booking.id, Booking.boat_id, Booking.start_date, Booking.end_date)
+            .where(
+                Booking.status.is_(None) | Booking.status.notin_(INACTIVE_STATUSES),
+                Booking.start_date.isnot(None),
+                Booking.end_date > now,
+            )
+            # Em ordem, cada add insere no fim da agenda
+            .order_by(Booking.boat_id, Booking.start_date, Booking.end_date, Booking.id)
+        )
+        schedules = {}
+        count = 0
+        for booking_id, boat_id, start_date, end_date in result:
+            schedules.setdefault(boat_id, BoatSchedule()).add(start_date, end_date, booking_id)
+            count += 1
+        self._schedules = schedules
+        self._loaded_at = time.monotonic()
+        logger.info(
+            "Índice de disponibilidade reconstruído: %d reservas em %.1fms",
+            count, (time.perf_counter() - start) * 1000,
+        )
+
+    def is_free(self, boat_id: int, start: datetime, end: datetime) -> bool:
+        schedule = self._schedules.get(boat_id)
+        if schedule is None:
+            return True
+        return not schedule.overlaps(naive_utc(start), naive_utc(end))
+
+    def add(self, booking: Booking):
+        if booking.status in INACTIVE_STATUSES:
+            return
+        self._schedules.setdefault(booking.boat_id, BoatSchedule()).add(
+            naive_utc(booking.start_date), naive_utc(booking.end_date), booking.id
+        )
+
+    def remove(self, booking: Booking):
+        schedule = self._schedules.get(booking.boat_id)
+        if schedule is not None:
+            schedule.remove(booking.id)
+            if not len(schedule):
+                del self._schedules[booking.boat_id]
+
+
+availability_index = AvailabilityIndex(refresh_seconds=settings.AVAILABILITY_INDEX_REFRESH_SECONDS)
@@ -0,0 +1,338 @@
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.db.models.boat import Boat
+from app.db.models.marina import Marina
+from app.db.models.partner_price import PartnerPrice
+from app.db.models.user import User
+from app.schemas.boat import BoatCreate
+from app.schemas.marina import MarinaCreate
+from app.schemas.partner_price import PartnerPriceCreate
+from app.services.availability import naive_utc
+from app.services.image_variants import existing_variant_urls
+from typing import Callable, Optional
+import asyncpg
+import csv
+import io
+import json
+import logging
+import orjson
+import tempfile
+import time
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def _json_or_none(value):
+    return json.dumps(value) if value is not None else None
+
+
+def _url_list(urls):
+    return [str(url) for url in urls] if urls is not None else None
+
+
+class ImportSpec:
+    """
+    Descreve a carga de uma tabela: schema de validação, colunas gravadas
+    pelo COPY, conversão do item validado para a tupla de valores e as
+    chaves estrangeiras verificadas antes da gravação ({campo: modelo}).
+    """
+
+    def __init__(self, model, schema, columns, to_record: Callable, references: dict = None):
+        self.model = model
+        self.table = model.__tablename__
+        self.schema = schema
+        self.columns = columns
+        self.to_record = to_record
+        self.references = references or {}
+
+
+def _boat_record(item: BoatCreate):
+    main_image_url = str(item.main_image_url) if item.main_image_url else None
+    return (
+        item.name, item.description, item.capacity, item.price_per_day, item.is_available,
+        item.owner_id, main_image_url, _json_or_none(_url_list(item.gallery_images)),
+        _json_or_none(existing_variant_urls(main_image_url, settings.UPLOADS_DIR)),
+    )
+
+
+def _marina_record(item: MarinaCreate):
+    main_image_url = str(item.main_image_url) if item.main_image_url else None
+    return (
+        item.name, item.description, item.latitude, item.longitude, item.address,
+        item.contact_phone, item.contact_email, _json_or_none(item.services), main_image_url,
+        _json_or_none(_url_list(item.gallery_images)),
+        _json_or_none(existing_variant_urls(main_image_url, settings.UPLOADS_DIR)),
+    )
+
+
+def _partner_price_record(item: PartnerPriceCreate):
+    return (item.partner_id, item.boat_id, item.price, naive_utc(item.start_date), naive_utc(item.end_date))
+
+
+BOAT_IMPORT = ImportSpec(
+    Boat, BoatCreate,
+    ("name", "description", "capacity", "price_per_day", "is_available", "owner_id",
+     "main_image_url", "gallery_images", "image_variants"),
+    _boat_record,
+    references={"owner_id": User},
+)
+
+MARINA_IMPORT = ImportSpec(
+    Marina, MarinaCreate,
+    ("name", "description", "latitude", "longitude", "address", "contact_phone", "contact_email",
+     "services", "main_image_url", "gallery_images", "image_variants"),
+    _marina_record,
+)
+
+PARTNER_PRICE_IMPORT = ImportSpec(
+    PartnerPrice, PartnerPriceCreate,
+    ("partner_id", "boat_id", "price", "start_date", "end_date"),
+    _partner_price_record,
+    references={"partner_id": User, "boat_id": Boat},
+)
+
+
+class ImportFileError(ValueError):
+    """Erro que invalida a carga inteira (arquivo ilegível ou lote recusado na conversão)."""
+
+
+def _csv_value(value: str):
+    # Células vazias ficam ausentes (valem os padrões do schema); listas vêm como JSON
+    if value == "":
+        return None
+    if value.startswith("["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _iter_rows(file, fmt: str):
+    """
+    Gera (número da linha, dict ou mensagem de erro) a partir do arquivo
+    temporário. Codificação inválida ou CSV malformado não têm como ser
+    retomados na linha seguinte: viram ImportFileError.
+    """
+    row_number = 0
+    try:
+        for row_number, data in _read_rows(file, fmt):
+            yield row_number, data
+    except UnicodeDecodeError:
+        # A decodificação é feita em blocos: a posição do erro não corresponde a uma linha
+        raise ImportFileError("O arquivo deve estar em UTF-8 (no Excel, salve como \"CSV UTF-8\")")
+    except csv.Error as e:
+        raise ImportFileError(f"Linha {row_number + 1}: CSV inválido ({e})")
+
+
+def _read_rows(file, fmt: str):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            if None in row:
+                yield row_number, "Quantidade de colunas maior que o cabeçalho"
+                continue
+            yield row_number, {k: v for k, v in ((k, _csv_value(v or "")) for k, v in row.items()) if v is not None}
+    else:
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                yield row_number, f"JSON inválido: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield row_number, "Cada linha deve ser um objeto JSON"
+                continue
+            yield row_number, data
+
+
+def _format_validation_error(error: ValidationError):
+    return [
+        f"{'.'.join(str(part) for part in e['loc']) or 'linha'}: {e['msg']}"
+        for e in error.errors()
+    ]
+
+
+class BulkImporter:
+    """
+    Importação em lote de CSV ou NDJSON.
+
+    O corpo da requisição é gravado num temporário em disco (memória
+    constante), lido em blocos de BULK_IMPORT_CHUNK_ROWS linhas e cada
+    bloco é validado com os schemas de criação no threadpool. As linhas
+    válidas são gravadas com COPY (asyncpg) na transação da sessão; o
+    commit é único ao final. Linhas inválidas entram no relatório com o
+    número da linha e os erros, sem interromper a carga (a menos que
+    all_or_nothing seja pedido).
+    """
+
+    def __init__(self, max_bytes: int, chunk_rows: int, max_errors: int):
+        self.max_bytes = max_bytes
+        self.chunk_rows = chunk_rows
+        self.max_errors = max_errors
+
+    @staticmethod
+    def detect_format(request: Request, fmt: Optional[str]) -> str:
+        if fmt:
+            if fmt not in ("csv", "ndjson"):
+                raise HTTPException(status_code=400, detail="Formato inválido (use csv ou ndjson)")
+            return fmt
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in CONTENT_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Envie text/csv ou application/x-ndjson",
+            )
+        return CONTENT_TYPES[content_type]
+
+    async def _spool(self, request: Request):
+        file = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_CHUNK_SIZE)
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > self.max_bytes:
+                file.close()
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Arquivo excede o limite de {self.max_bytes // (1024 * 1024)}MB",
+                )
+            await run_in_threadpool(file.write, chunk)
+        file.seek(0)
+        return file
+
+    def _parse_chunk(self, rows, spec: ImportSpec, authorize):
+        """Lê até chunk_rows linhas e valida; executado no threadpool."""
+        received = 0
+        valid = []
+        errors = []
+        for row_number, data in rows:
+            received += 1
+            if isinstance(data, str):
+                errors.append((row_number, [data]))
+            else:
+                try:
+                    item = spec.schema.model_validate(data)
+                except ValidationError as e:
+                    errors.append((row_number, _format_validation_error(e)))
+                else:
+                    error = authorize(item) if authorize else None
+                    if error:
+                        errors.append((row_number, [error]))
+                    else:
+                        valid.append((row_number, item))
+            if received >= self.chunk_rows:
+                break
+        return received, valid, errors
+
+    async def _check_references(self, db: AsyncSession, spec: ImportSpec, valid):
+        errors = []
+        for field, model in spec.references.items():
+            ids = {getattr(item, field) for _, item in valid}
+            if not ids:
+                continue
+            existing = set((await db.scalars(select(model.id).where(model.id.in_(ids)))).all())
+            missing = ids - existing
+            if missing:
+                errors.extend(
+                    (row_number, [f"{field}: registro {getattr(item, field)} não encontrado"])
+                    for row_number, item in valid
+                    if getattr(item, field) in missing
+                )
+                valid = [(row_number, item) for row_number, item in valid if getattr(item, field) not in missing]
+        return valid, errors
+
+    async def run(
+        self,
+        db: AsyncSession,
+        request: Request,
+        spec: ImportSpec,
+        fmt: Optional[str] = None,
+        all_or_nothing: bool = False,
+        authorize: Callable = None,
+    ) -> dict:
+        fmt = self.detect_format(request, fmt)
+        started = time.perf_counter()
+        file = await self._spool(request)
+        received = inserted = error_count = 0
+        errors = []
+        try:
+            rows = _iter_rows(file, fmt)
+            connection = await db.connection()
+            raw = (await connection.get_raw_connection()).driver_connection
+            while True:
+                count, valid, chunk_errors = await run_in_threadpool(self._parse_chunk, rows, spec, authorize)
+                if not count:
+                    break
+                received += count
+                valid, reference_errors = await self._check_references(db, spec, valid)
+                chunk_errors.extend(reference_errors)
+                chunk_errors.sort(key=lambda e: e[0])
+                error_count += len(chunk_errors)
+                errors.extend(chunk_errors[:max(self.max_errors - len(errors), 0)])
+                if all_or_nothing and error_count:
+                    # Nada será gravado; continuar apenas validando para o relatório
+                    continue
+                if valid:
+                    try:
+                        await raw.copy_records_to_table(
+                            spec.table,
+                            records=[spec.to_record(item) for _, item in valid],
+                            columns=spec.columns,
+                        )
+                    except (asyncpg.DataError, OverflowError, ValueError, TypeError) as e:
+                        # Conversão feita pelo asyncpg no cliente (ex.: inteiro fora da faixa da coluna)
+                        first, last = valid[0][0], valid[-1][0]
+                        lines = f"Linha {first}" if first == last else f"Linhas {first} a {last}"
+                        raise ImportFileError(f"{lines}: valor incompatível com a coluna ({e})")
+                    inserted += len(valid)
+        except ImportFileError as e:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+        except asyncpg.PostgresError as e:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail=f"Falha ao gravar o lote: {e}")
+        finally:
+            file.close()
+
+        if all_or_nothing and error_count:
+            await db.rollback()
+            inserted = 0
+        else:
+            await db.commit()
+
+        logger.info(
+            "Importação em lote em %s: %d linhas recebidas, %d gravadas, %d com erro em %.1fs",
+            spec.table, received, inserted, error_count, time.perf_counter() - started,
+        )
+        return {
+            "format": fmt,
+            "received": received,
+            "inserted": inserted,
+            "error_count": error_count,
+            "errors": [{"row": row_number, "errors": messages} for row_number, messages in errors],
+            "errors_truncated": error_count > len(errors),
+        }
+
+
+bulk_importer = BulkImporter(
+    max_bytes=settings.BULK_IMPORT_MAX_BYTES,
+    chunk_rows=settings.BULK_IMPORT_CHUNK_ROWS,
+    max_errors=settings.BULK_IMPORT_MAX_ERRORS,
+)
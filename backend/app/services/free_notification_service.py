@@ -1,129 +1,77 @@
-from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import get_settings
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from app.db.models.notification_outbox import NotificationOutbox
 import logging
-import json
-import requests
 
 settings = get_settings()
 
 logger = logging.getLogger(__name__)
 
 class FreeNotificationService:
+    """
+    Monta as mensagens e as grava no outbox (tabela notification_outbox).
+
+    A entrega por Gmail SMTP e WhatsApp Cloud API é feita pelo worker em
+    app/services/notification_worker.py, fora do ciclo da requisição.
+    """
+
     @staticmethod
-    async def send_email(email: str, recovery_code: str):
+    def recovery_email(recovery_code: str):
+        subject = "Código de Recuperação de Senha - Funntour"
+
+        # Corpo do email em HTML
+        body = f"""
+        <html>
+            <body>
+                <h2>Código de Recuperação de Senha</h2>
+                <p>Olá,</p>
+                <p>Você solicitou a recuperação de senha para sua conta na Funntour.</p>
+                <p>Seu código de recuperação é: <strong>{recovery_code}</strong></p>
+                <p>Este código expira em 30 minutos.</p>
+                <p>Atenciosamente,</p>
+                <p>Equipe Funntour</p>
+            </body>
+        </html>
         """
-        Envia um email usando Gmail SMTP
+        return subject, body
+
+    @staticmethod
+    def recovery_whatsapp(recovery_code: str):
+        return f"""
+        Olá,
+
+        Você solicitou a recuperação de senha para sua conta na Funntour.
+        Seu código de recuperação é: {recovery_code}
+
+        Este código expira em 30 minutos.
+
+        Atenciosamente,
+        Equipe Funntour
         """
-        try:
-            # Configurações do email
-            sender_email = settings.GMAIL_EMAIL
-            sender_password = settings.GMAIL_APP_PASSWORD
-            subject = "Código de Recuperação de Senha - Funntour"
-            
-            # Criar mensagem
-            msg = MIMEMultipart()
-            msg['From'] = sender_email
-            msg['To'] = email
-            msg['Subject'] = subject
-            
-            # Corpo do email em HTML
-            body = f"""
-            <html>
-                <body>
-                    <h2>Código de Recuperação de Senha</h2>
-                    <p>Olá,</p>
-                    <p>Você solicitou a recuperação de senha para sua conta na Funntour.</p>
-                    <p>Seu código de recuperação é: <strong>{recovery_code}</strong></p>
-                    <p>Este código expira em 30 minutos.</p>
-                    <p>Atenciosamente,</p>
-                    <p>Equipe Funntour</p>
-                </body>
-            </html>
-            """
-            
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Enviar email usando Gmail SMTP
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
-                server.starttls()
-                server.login(sender_email, sender_password)
-                server.send_message(msg)
-            
-            logger.info(f"Email enviado com sucesso para {email}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Erro ao enviar email: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao enviar email: {str(e)}"
-            )
 
     @staticmethod
-    async def send_whatsapp(phone: str, recovery_code: str):
+    def normalize_phone(phone: str) -> str:
+        phone = phone.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
+        if not phone.startswith("+55"):
+            phone = "+55" + phone
+        return phone
+
+    def enqueue_email(self, db: AsyncSession, email: str, subject: str, body: str):
+        db.add(NotificationOutbox(channel="email", recipient=email, subject=subject, body=body))
+
+    def enqueue_whatsapp(self, db: AsyncSession, phone: str, body: str):
+        db.add(NotificationOutbox(channel="whatsapp", recipient=self.normalize_phone(phone), body=body))
+
+    def enqueue_recovery_code(self, db: AsyncSession, email: str, whatsapp: str, recovery_code: str):
         """
-        Envia uma mensagem WhatsApp usando WhatsApp Cloud API
+        Adiciona as mensagens com o código de recuperação à sessão; são
+        gravadas no mesmo commit que o próprio código.
         """
-        try:
-            if not phone:
-                return False
-                
-            # Formatar o número de telefone
-            phone = phone.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-            if not phone.startswith("+55"):
-                phone = "+55" + phone
-            
-            # Configurações do WhatsApp Cloud API
-            url = f"https://graph.facebook.com/v17.0/{settings.WHATSAPP_CLOUD_API_ID}/messages"
-            headers = {
-                "Authorization": f"Bearer {settings.WHATSAPP_CLOUD_API_TOKEN}",
-                "Content-Type": "application/json"
-            }
-            
-            # Mensagem
-            message = f"""
-            Olá,
-            
-            Você solicitou a recuperação de senha para sua conta na Funntour.
-            Seu código de recuperação é: {recovery_code}
-            
-            Este código expira em 30 minutos.
-            
-            Atenciosamente,
-            Equipe Funntour
-            """
-            
-            # Dados da requisição
-            data = {
-                "messaging_product": "whatsapp",
-                "to": phone,
-                "type": "text",
-                "text": {
-                    "body": message
-                }
-            }
-            
-            # Enviar mensagem
-            response = requests.post(url, headers=headers, json=data)
-            
-            if response.status_code == 200:
-                logger.info(f"WhatsApp enviado com sucesso para {phone}")
-                return True
-            else:
-                logger.error(f"Erro ao enviar WhatsApp: {response.text}")
-                raise HTTPException(
-                    status_code=500,
-                    detail="Erro ao enviar WhatsApp"
-                )
-            
-        except Exception as e:
-            logger.error(f"Erro ao enviar WhatsApp: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao enviar WhatsApp: {str(e)}"
-            )
+        subject, body = self.recovery_email(recovery_code)
+        self.enqueue_email(db, email, subject, body)
+
+        # Enviar por WhatsApp se disponível
+        if whatsapp:
+            self.enqueue_whatsapp(db, whatsapp, self.recovery_whatsapp(recovery_code))
 
 free_notification_service = FreeNotificationService()
@@ -0,0 +1,150 @@
+from sqlalchemy import update
+from app.core.config import get_settings
+from app.core.response_cache import response_cache
+from app.db.base import AsyncSessionLocal
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+import multiprocessing
+import asyncio
+import logging
+import os
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Variantes geradas para cada imagem enviada: nome -> maior lado em pixels
+VARIANTS = {
+    "thumbnail": 160,
+    "card": 480,
+    "full": 1600,
+}
+WEBP_QUALITY = 80
+
+# Caches de resposta que exibem as variantes de cada tabela (as marinas aninham as embarcações)
+CACHED_TABLES = {
+    "boats": ("boats", "marinas"),
+    "marinas": ("marinas",),
+}
+
+
+def variant_filename(original_filename: str, variant: str) -> str:
+    # O nome do original já é o SHA-256 do conteúdo, então as variantes também são endereçadas por conteúdo
+    return f"{Path(original_filename).stem}_{variant}.webp"
+
+
+def variant_urls(image_url: Optional[str]) -> Optional[dict]:
+    """URLs das variantes de uma imagem em /uploads; None para imagens externas."""
+    if not image_url:
+        return None
+    image_url = str(image_url)
+    if not image_url.startswith("/uploads/"):
+        return None
+    filename = image_url[len("/uploads/"):]
+    return {variant: f"/uploads/{variant_filename(filename, variant)}" for variant in VARIANTS}
+
+
+def existing_variant_urls(image_url: Optional[str], uploads_dir: str) -> Optional[dict]:
+    """variant_urls, mas apenas se todas as variantes já existem em disco."""
+    urls = variant_urls(image_url)
+    if urls and all(os.path.exists(os.path.join(uploads_dir, url[len("/uploads/"):])) for url in urls.values()):
+        return urls
+    return None
+
+
+# Executado dentro do pool de processos
+
+def _generate_variants(source_path: str, variants: dict, quality: int) -> list:
+    from PIL import Image, ImageOps
+
+    source = Path(source_path)
+    generated = []
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for variant, max_size in variants.items():
+            target = source.with_name(variant_filename(source.name, variant))
+            if target.exists():
+                continue
+            resized = image.copy()
+            resized.thumbnail((max_size, max_size), Image.LANCZOS)
+            temp = target.with_name(f".{target.name}.tmp")
+            resized.save(temp, format="WEBP", quality=quality, method=4)
+            os.replace(temp, target)
+            generated.append(target.name)
+    return generated
+
+
+class ImageVariantService:
+    """
+    Gera em segundo plano as variantes redimensionadas (WebP) das imagens
+    enviadas, num pool de processos para não disputar CPU com o event loop.
+
+    As variantes são gravadas ao lado do original. As URLs só são salvas
+    em image_variants depois que a geração termina com sucesso; até lá (ou
+    se ela falhar) o registro fica com image_variants nulo e os clientes
+    usam a imagem principal.
+    """
+
+    def __init__(self, uploads_dir: str, workers: int = 2):
+        self.uploads_dir = Path(uploads_dir)
+        self.workers = workers
+        self._executor = None
+        self._tasks = set()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def schedule(self, image_url: Optional[str], model, row_id: int):
+        """Gera as variantes de `image_url` e depois as grava na linha `row_id` de `model`."""
+        urls = variant_urls(image_url)
+        if not urls:
+            return
+        task = asyncio.get_running_loop().create_task(self._generate_and_save(image_url, urls, model, row_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _generate_and_save(self, image_url: str, urls: dict, model, row_id: int):
+        source = self.uploads_dir / image_url[len("/uploads/"):]
+        try:
+            generated = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), _generate_variants, str(source), VARIANTS, WEBP_QUALITY
+            )
+        except Exception as e:
+            logger.error("Erro ao gerar variantes de %s: %s", source.name, e)
+            return
+        if generated:
+            logger.info("Variantes geradas para %s: %s", source.name, ", ".join(generated))
+
+        try:
+            async with AsyncSessionLocal() as db:
+                # Só se a imagem principal não mudou enquanto as variantes eram geradas
+                await db.execute(
+                    update(model)
+                    .where(model.id == row_id, model.main_image_url == image_url)
+                    .values(image_variants=urls)
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Erro ao gravar as variantes de %s (%s %s)", source.name, model.__tablename__, row_id)
+            return
+        response_cache.invalidate(*CACHED_TABLES.get(model.__tablename__, ()))
+
+    def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_variant_service = ImageVariantService(
+    uploads_dir=settings.UPLOADS_DIR,
+    workers=settings.IMAGE_VARIANT_WORKERS,
+)
@@ -0,0 +1,150 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.marina import Marina
+from app.core.config import get_settings
+from bisect import insort
+import asyncio
+import logging
+import math
+import time
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float):
+    """Retângulo (lat_min, lat_max, lon_min, lon_max) que contém o círculo de busca."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat < 1e-6 or abs(lat) + dlat >= 90:
+        dlon = 180.0
+    else:
+        dlon = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+class MarinaGeoIndex:
+    """
+    Grade regular (células de `cell_degrees` graus) com as coordenadas das
+    marinas, mantida em memória.
+
+    Uma busca por raio visita apenas as células que cruzam o retângulo
+    envolvente do círculo e calcula a distância exata (haversine) só para
+    as marinas dessas células. O índice é carregado na primeira consulta,
+    atualizado pelas rotas de escrita de marinas e recarregado a cada
+    `refresh_seconds` para refletir escritas feitas por outros workers.
+    """
+
+    def __init__(self, cell_degrees: float = 0.5, refresh_seconds: int = 300):
+        self.cell_degrees = cell_degrees
+        self.refresh_seconds = refresh_seconds
+        self._cells = {}
+        self._positions = {}  # marina_id -> (lat, lon)
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def _loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _cell(self, lat: float, lon: float):
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def _is_fresh(self) -> bool:
+        return self._loaded and time.monotonic() - self._loaded_at < self.refresh_seconds
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            start = time.perf_counter()
+            result = await db.execute(select(Marina.id, Marina.latitude, Marina.longitude))
+            self._cells = {}
+            self._positions = {}
+            for marina_id, lat, lon in result:
+                self._put(marina_id, lat, lon)
+            self._loaded_at = time.monotonic()
+            logger.info(
+                "Índice geográfico de marinas carregado: %d marinas em %.1fms",
+                len(self._positions), (time.perf_counter() - start) * 1000,
+            )
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _put(self, marina_id: int, lat: float, lon: float):
+        if lat is None or lon is None:
+            return
+        self._positions[marina_id] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), []).append(marina_id)
+
+    def upsert(self, marina: Marina):
+        if not self._loaded:
+            return
+        self.remove(marina.id)
+        self._put(marina.id, marina.latitude, marina.longitude)
+
+    def remove(self, marina_id: int):
+        if not self._loaded:
+            return
+        position = self._positions.pop(marina_id, None)
+        if position is not None:
+            cell = self._cells.get(self._cell(*position))
+            if cell is not None:
+                cell.remove(marina_id)
+                if not cell:
+                    del self._cells[self._cell(*position)]
+
+    def nearby(self, lat: float, lon: float, radius_km: float, limit: int):
+        """Lista de (distância_km, marina_id) ordenada pela distância."""
+        lat_min, lat_max, lon_min, lon_max = bounding_box(lat, lon, radius_km)
+        row_min, col_min = self._cell(max(lat_min, -90.0), lon_min)
+        row_max, col_max = self._cell(min(lat_max, 90.0), lon_max)
+
+        # Quando há mais células no retângulo do que células ocupadas (ou o
+        # retângulo cruza o antimeridiano), percorrer as células ocupadas
+        span = (row_max - row_min + 1) * (col_max - col_min + 1)
+        if span > len(self._cells) or lon_min < -180.0 or lon_max > 180.0:
+            candidates = (
+                marina_id
+                for (row, col), ids in self._cells.items()
+                if row_min <= row <= row_max
+                for marina_id in ids
+            )
+        else:
+            candidates = (
+                marina_id
+                for row in range(row_min, row_max + 1)
+                for col in range(col_min, col_max + 1)
+                for marina_id in self._cells.get((row, col), ())
+            )
+
+        results = []
+        for marina_id in candidates:
+            m_lat, m_lon = self._positions[marina_id]
+            distance = haversine_km(lat, lon, m_lat, m_lon)
+            if distance <= radius_km:
+                insort(results, (distance, marina_id))
+                if len(results) > limit:
+                    results.pop()
+        return results
+
+
+marina_geo_index = MarinaGeoIndex(
+    cell_degrees=settings.MARINA_GEO_INDEX_CELL_DEGREES,
+    refresh_seconds=settings.MARINA_GEO_INDEX_REFRESH_SECONDS,
+)
@@ -0,0 +1,318 @@
+from sqlalchemy import select, update, func
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.db.base import AsyncSessionLocal
+from app.db.models.notification_outbox import NotificationOutbox
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from datetime import timedelta
+import smtplib
+import asyncio
+import logging
+import httpx
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnection:
+    """
+    Conexão SMTP persistente (TLS + login feitos uma única vez).
+
+    Se o servidor encerrar a conexão ociosa, ela é reaberta no próximo
+    envio. Os métodos são bloqueantes e devem rodar no threadpool.
+    """
+
+    def __init__(self, host: str, port: int, use_tls: bool, username: str = None, password: str = None, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self._server = server
+
+    def _build_message(self, recipient: str, subject: str, body: str):
+        msg = MIMEMultipart()
+        msg['From'] = self.username or "no-reply@funntour.com"
+        msg['To'] = recipient
+        msg['Subject'] = subject or ""
+        msg.attach(MIMEText(body, 'html'))
+        return msg
+
+    def send(self, recipient: str, subject: str, body: str):
+        msg = self._build_message(recipient, subject, body)
+        for attempt in range(2):
+            if self._server is None:
+                self._connect()
+            try:
+                self._server.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Conexão derrubada pelo servidor: reabrir e tentar mais uma vez
+                self.close()
+                if attempt:
+                    raise
+
+    def send_many(self, messages) -> dict:
+        """Envia [(id, destinatário, assunto, corpo)] e retorna {id: erro ou None}."""
+        results = {}
+        for message_id, recipient, subject, body in messages:
+            try:
+                self.send(recipient, subject, body)
+                results[message_id] = None
+            except Exception as e:
+                self.close()
+                results[message_id] = f"{type(e).__name__}: {e}"
+        return results
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+
+class OutboxWorker:
+    """
+    Entrega as mensagens pendentes da tabela notification_outbox.
+
+    Cada ciclo reserva um lote com FOR UPDATE SKIP LOCKED (vários workers
+    podem rodar em paralelo), envia os emails pelas conexões SMTP
+    persistentes e as mensagens de WhatsApp por um cliente HTTP assíncrono
+    com pool de conexões, respeitando o limite de concorrência de cada
+    canal. Falhas são reagendadas com backoff exponencial até
+    OUTBOX_MAX_ATTEMPTS, quando a mensagem é marcada como "failed".
+    Mensagens de um canal sem credenciais configuradas (ou desconhecido)
+    são marcadas como "failed" de imediato, sem novas tentativas.
+    """
+
+    def __init__(self):
+        self.poll_interval = settings.OUTBOX_POLL_INTERVAL_SECONDS
+        self.batch_size = settings.OUTBOX_BATCH_SIZE
+        self.lease = timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        self.max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+        self.retry_base = settings.OUTBOX_RETRY_BASE_SECONDS
+        self._smtp_connections = [
+            SMTPConnection(
+                settings.SMTP_HOST,
+                settings.SMTP_PORT,
+                settings.SMTP_USE_TLS,
+                settings.GMAIL_EMAIL,
+                settings.GMAIL_APP_PASSWORD,
+                settings.SMTP_TIMEOUT_SECONDS,
+            )
+            for _ in range(max(1, settings.OUTBOX_EMAIL_CONNECTIONS))
+        ]
+        self._whatsapp_semaphore = asyncio.Semaphore(settings.OUTBOX_WHATSAPP_CONCURRENCY)
+        self._http_client = None
+        self._task = None
+        # Canais com credenciais; os demais não teriam como entregar nenhuma mensagem
+        self.configured_channels = set()
+        if settings.GMAIL_EMAIL and settings.GMAIL_APP_PASSWORD:
+            self.configured_channels.add("email")
+        if settings.WHATSAPP_CLOUD_API_ID and settings.WHATSAPP_CLOUD_API_TOKEN:
+            self.configured_channels.add("whatsapp")
+
+        # Métricas
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def _get_http_client(self):
+        if self._http_client is None:
+            limits = httpx.Limits(
+                max_connections=settings.OUTBOX_WHATSAPP_CONCURRENCY,
+                max_keepalive_connections=settings.OUTBOX_WHATSAPP_CONCURRENCY,
+            )
+            self._http_client = httpx.AsyncClient(
+                base_url=settings.WHATSAPP_API_BASE_URL,
+                headers={"Authorization": f"Bearer {settings.WHATSAPP_CLOUD_API_TOKEN}"},
+                limits=limits,
+                timeout=10.0,
+            )
+        return self._http_client
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        for connection in self._smtp_connections:
+            await run_in_threadpool(connection.close)
+
+    async def run(self):
+        if "email" not in self.configured_channels:
+            logger.warning("GMAIL_EMAIL/GMAIL_APP_PASSWORD não configurados: notificações por email serão marcadas como falhas")
+        if "whatsapp" not in self.configured_channels:
+            logger.warning(
+                "WHATSAPP_CLOUD_API_ID/WHATSAPP_CLOUD_API_TOKEN não configurados: "
+                "notificações por WhatsApp serão marcadas como falhas"
+            )
+        while True:
+            try:
+                processed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro no worker do outbox de notificações")
+                processed = 0
+            if not processed:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _claim(self, db):
+        # "sending" com lease vencido: worker anterior caiu no meio do envio
+        ready = (
+            select(NotificationOutbox.id)
+            .where(
+                NotificationOutbox.status.in_(("pending", "sending")),
+                NotificationOutbox.next_attempt_at <= func.now(),
+            )
+            .order_by(NotificationOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(ready))
+            .values(
+                status="sending",
+                attempts=NotificationOutbox.attempts + 1,
+                next_attempt_at=func.now() + self.lease,
+            )
+            .returning(
+                NotificationOutbox.id,
+                NotificationOutbox.channel,
+                NotificationOutbox.recipient,
+                NotificationOutbox.subject,
+                NotificationOutbox.body,
+                NotificationOutbox.attempts,
+            )
+        )
+        return result.all()
+
+    async def process_batch(self) -> int:
+        async with AsyncSessionLocal() as db:
+            claimed = await self._claim(db)
+            await db.commit()
+        if not claimed:
+            return 0
+
+        # Canal sem credenciais (ou desconhecido): erro definitivo, não adianta tentar de novo
+        undeliverable = {
+            m.id: f"Canal {m.channel} não configurado" if m.channel in ("email", "whatsapp") else "Canal desconhecido"
+            for m in claimed
+            if m.channel not in self.configured_channels
+        }
+        emails = [m for m in claimed if m.channel == "email" and m.id not in undeliverable]
+        whatsapps = [m for m in claimed if m.channel == "whatsapp" and m.id not in undeliverable]
+        results = dict(undeliverable)
+
+        email_results, whatsapp_results = await asyncio.gather(
+            self._deliver_emails(emails),
+            asyncio.gather(*[self._deliver_whatsapp(m) for m in whatsapps]),
+        )
+        results.update(email_results)
+        results.update(dict(whatsapp_results))
+
+        async with AsyncSessionLocal() as db:
+            await self._record(db, claimed, results, undeliverable)
+            await db.commit()
+        return len(claimed)
+
+    async def _deliver_emails(self, messages) -> dict:
+        if not messages:
+            return {}
+        # Distribuir o lote entre as conexões persistentes
+        connections = self._smtp_connections
+        groups = [[] for _ in connections]
+        for i, m in enumerate(messages):
+            groups[i % len(connections)].append((m.id, m.recipient, m.subject, m.body))
+        partial = await asyncio.gather(*[
+            run_in_threadpool(connection.send_many, group)
+            for connection, group in zip(connections, groups)
+            if group
+        ])
+        results = {}
+        for r in partial:
+            results.update(r)
+        return results
+
+    async def _deliver_whatsapp(self, message):
+        data = {
+            "messaging_product": "whatsapp",
+            "to": message.recipient,
+            "type": "text",
+            "text": {
+                "body": message.body
+            }
+        }
+        async with self._whatsapp_semaphore:
+            try:
+                response = await self._get_http_client().post(
+                    f"/{settings.WHATSAPP_CLOUD_API_ID}/messages", json=data
+                )
+            except httpx.HTTPError as e:
+                return message.id, f"{type(e).__name__}: {e}"
+        if response.status_code == 200:
+            return message.id, None
+        return message.id, f"HTTP {response.status_code}: {response.text[:500]}"
+
+    async def _record(self, db, claimed, results: dict, undeliverable=()):
+        for message in claimed:
+            error = results.get(message.id)
+            query = update(NotificationOutbox).where(NotificationOutbox.id == message.id)
+            if error is None:
+                self.sent += 1
+                await db.execute(query.values(status="sent", sent_at=func.now(), last_error=None))
+            elif message.id in undeliverable:
+                # Já avisado no início do worker; uma linha de log por mensagem seria só ruído
+                self.failed += 1
+                await db.execute(query.values(status="failed", last_error=error))
+            elif message.attempts >= self.max_attempts:
+                self.failed += 1
+                logger.error("Notificação %d descartada após %d tentativas: %s", message.id, message.attempts, error)
+                await db.execute(query.values(status="failed", last_error=error))
+            else:
+                self.retried += 1
+                delay = timedelta(seconds=self.retry_base * 2 ** (message.attempts - 1))
+                logger.warning("Falha ao enviar notificação %d (tentativa %d): %s", message.id, message.attempts, error)
+                await db.execute(query.values(
+                    status="pending",
+                    next_attempt_at=func.now() + delay,
+                    last_error=error,
+                ))
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+
+outbox_worker = OutboxWorker()
+
+
+if __name__ == "__main__":
+    # Execução dedicada: python -m app.services.notification_worker
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(outbox_worker.run())
@@ -0,0 +1,123 @@
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import get_settings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import asyncio
+import logging
+import time
+import os
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Funções executadas dentro do pool (precisam ser picklable, por isso ficam no módulo)
+
+def _hash_password(password: str):
+    start = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    return hashed, time.perf_counter() - start
+
+def _verify_password(plain_password: str, hashed_password: str):
+    start = time.perf_counter()
+    valid = pwd_context.verify(plain_password, hashed_password)
+    return valid, time.perf_counter() - start
+
+
+class PasswordHasher:
+    """
+    Executa bcrypt fora do event loop, em um pool dedicado e limitado.
+
+    Quando há mais operações pendentes do que workers + fila, a requisição
+    é rejeitada imediatamente com 503 em vez de aguardar indefinidamente.
+    """
+
+    def __init__(self, executor_type: str = "process", workers: int = None, max_queue: int = 64):
+        self.executor_type = executor_type
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers + max_queue
+        self._executor = None
+        # Só é alterado na thread do event loop, portanto dispensa lock
+        self._pending = 0
+
+        # Métricas
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_type == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning("Pool de hashing saturado (%d pendentes), rejeitando requisição", self._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, tente novamente em instantes",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, hash_time = await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+        queue_wait = max(time.perf_counter() - submitted - hash_time, 0.0)
+        self.completed += 1
+        self.queue_wait_seconds += queue_wait
+        self.hash_seconds += hash_time
+        self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, queue_wait)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_seconds_total": self.queue_wait_seconds,
+            "queue_wait_seconds_avg": self.queue_wait_seconds / completed,
+            "queue_wait_seconds_max": self.max_queue_wait_seconds,
+            "hash_seconds_total": self.hash_seconds,
+            "hash_seconds_avg": self.hash_seconds / completed,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,158 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.partner_price import PartnerPrice
+from app.core.config import get_settings
+from app.services.availability import naive_utc
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import heapq
+import time
+
+settings = get_settings()
+
+ONE_DAY = timedelta(days=1)
+
+
+def _days_between(start: datetime, instant: datetime, total_days: int) -> int:
+    """Quantidade de dias da reserva (start + i dias, 0 <= i < total_days) que começam antes de `instant`."""
+    if instant <= start:
+        return 0
+    # Divisão inteira com arredondamento para cima
+    days = -((start - instant) // ONE_DAY)
+    return min(days, total_days)
+
+
+class BoatPriceSchedule:
+    """
+    Faixas de preço de parceiro de uma embarcação, achatadas em segmentos
+    [início, fim) sem sobreposição e ordenados pelo início.
+
+    Quando faixas se sobrepõem, vale a cadastrada mais recentemente (maior
+    id). A cotação localiza o primeiro segmento por busca binária e percorre
+    apenas os k segmentos que cruzam o período: O(log n + k).
+    """
+
+    def __init__(self, ranges):
+        self._segments = self._flatten(ranges)
+        self._starts = [segment[0] for segment in self._segments]
+
+    @staticmethod
+    def _flatten(ranges):
+        """ranges: [(id, início, fim, preço)] -> [(início, fim, preço)]"""
+        ranges = [r for r in ranges if r[1] is not None and r[2] is not None and r[1] < r[2]]
+        boundaries = sorted({r[1] for r in ranges} | {r[2] for r in ranges})
+        by_start = sorted(ranges, key=lambda r: r[1])
+
+        segments = []
+        active = []  # heap de (-id, fim, preço)
+        next_range = 0
+        for left, right in zip(boundaries, boundaries[1:]):
+            while next_range < len(by_start) and by_start[next_range][1] <= left:
+                range_id, _, end, price = by_start[next_range]
+                heapq.heappush(active, (-range_id, end, price))
+                next_range += 1
+            # Remover faixas já encerradas (remoção preguiçosa)
+            while active and active[0][1] <= left:
+                heapq.heappop(active)
+            if not active:
+                continue
+            price = active[0][2]
+            if segments and segments[-1][1] == left and segments[-1][2] == price:
+                segments[-1] = (segments[-1][0], right, price)
+            else:
+                segments.append((left, right, price))
+        return segments
+
+    def quote(self, start: datetime, end: datetime, base_price: float) -> dict:
+        # Mesma regra de antes: são cobrados os dias inteiros do período
+        total_days = (end - start).days
+        breakdown = []
+        partner_days = 0
+        total = 0.0
+
+        i = max(bisect_right(self._starts, start) - 1, 0)
+        while i < len(self._segments) and total_days > 0:
+            seg_start, seg_end, price = self._segments[i]
+            if seg_start >= start + total_days * ONE_DAY:
+                break
+            days = _days_between(start, seg_end, total_days) - _days_between(start, seg_start, total_days)
+            if days > 0:
+                partner_days += days
+                total += days * price
+                breakdown.append({
+                    "start": max(seg_start, start),
+                    "end": min(seg_end, end),
+                    "days": days,
+                    "price_per_day": price,
+                    "source": "partner",
+                })
+            i += 1
+
+        base_days = total_days - partner_days
+        if base_days > 0:
+            total += base_days * (base_price or 0.0)
+            breakdown.append({
+                "days": base_days,
+                "price_per_day": base_price,
+                "source": "base",
+            })
+
+        return {
+            "days": max(total_days, 0),
+            "total_price": round(total, 2),
+            "breakdown": breakdown,
+        }
+
+
+class PricingEngine:
+    """
+    Resolve o preço efetivo de uma embarcação num período combinando as
+    faixas de PartnerPrice com o preço base (price_per_day).
+
+    A agenda de preços de cada embarcação é carregada sob demanda e mantida
+    num cache LRU de até PRICING_CACHE_MAX_SIZE embarcações; as rotas de
+    partner prices chamam invalidate() ao gravar e cada entrada expira após
+    PRICING_CACHE_TTL_SECONDS para refletir escritas de outros workers.
+    Usado apenas no event loop, sem locks.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._schedules = OrderedDict()  # boat_id -> (carregado_em, BoatPriceSchedule)
+
+    def invalidate(self, boat_id: int):
+        self._schedules.pop(boat_id, None)
+
+    def clear(self):
+        self._schedules.clear()
+
+    async def _get_schedule(self, db: AsyncSession, boat_id: int) -> BoatPriceSchedule:
+        cached = self._schedules.get(boat_id)
+        if cached is not None:
+            if time.monotonic() - cached[0] < self.ttl_seconds:
+                self._schedules.move_to_end(boat_id)
+                return cached[1]
+            del self._schedules[boat_id]
+        result = await db.execute(
+            select(PartnerPrice.id, PartnerPrice.start_date, PartnerPrice.end_date, PartnerPrice.price)
+            .where(PartnerPrice.boat_id == boat_id)
+        )
+        schedule = BoatPriceSchedule(result.all())
+        self._schedules[boat_id] = (time.monotonic(), schedule)
+        self._schedules.move_to_end(boat_id)
+        while len(self._schedules) > self.max_size:
+            self._schedules.popitem(last=False)
+        return schedule
+
+    async def quote(self, db: AsyncSession, boat, start: datetime, end: datetime) -> dict:
+        schedule = await self._get_schedule(db, boat.id)
+        quote = schedule.quote(naive_utc(start), naive_utc(end), boat.price_per_day)
+        return {"boat_id": boat.id, "start": start, "end": end, **quote}
+
+
+pricing_engine = PricingEngine(
+    ttl_seconds=settings.PRICING_CACHE_TTL_SECONDS,
+    max_size=settings.PRICING_CACHE_MAX_SIZE,
+)
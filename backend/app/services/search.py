@@ -0,0 +1,85 @@
+from sqlalchemy import select, func, literal, union_all, tuple_, Float, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.boat import Boat
+from app.db.models.marina import Marina
+from app.db.pagination import encode_cursor, decode_cursor, MAX_PAGE_SIZE
+import re
+
+# Configuração de busca do Postgres; o documento é montado pela função
+# search_document() (migração 2026_10_16_160000) com a mesma configuração
+TS_CONFIG = "portuguese"
+MAX_TERMS = 8
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _to_tsquery(config: str, expression: str):
+    return func.to_tsquery(config, func.f_unaccent(expression))
+
+
+def build_tsquery(q: str):
+    """
+    Converte o texto digitado num tsquery: todos os termos são obrigatórios
+    e o último também casa por prefixo (type-ahead). Retorna None se não
+    houver termos.
+
+    O prefixo não passa pelo stemmer (configuração "simple"): o radical de
+    uma palavra incompleta costuma ser curto demais ("veleir" -> "vel") e
+    casaria termos sem relação; a palavra completa continua casando pelo
+    radical.
+    """
+    words = WORD.findall(q.lower())[:MAX_TERMS]
+    if not words:
+        return None
+    *head, last = words
+    tsquery = _to_tsquery(TS_CONFIG, f"'{last}'").op("||")(_to_tsquery("simple", f"'{last}':*"))
+    if head:
+        tsquery = _to_tsquery(TS_CONFIG, " & ".join(f"'{word}'" for word in head)).op("&&")(tsquery)
+    return tsquery
+
+
+def _matches(model, kind: str, tsquery):
+    return select(
+        literal(kind, String).label("type"),
+        model.id.label("id"),
+        model.name.label("name"),
+        model.description.label("description"),
+        model.main_image_url.label("main_image_url"),
+        model.image_variants.label("image_variants"),
+        func.ts_rank_cd(model.search_vector, tsquery, type_=Float).label("rank"),
+    ).where(model.search_vector.op("@@")(tsquery))
+
+
+async def search(db: AsyncSession, q: str, cursor: str = None, limit: int = 20) -> dict:
+    """
+    Busca textual ranqueada em embarcações (disponíveis) e marinas.
+
+    Usa os índices GIN de search_vector; os resultados dos dois tipos são
+    combinados e ordenados por relevância, com paginação por cursor sobre
+    (rank, type, id).
+    """
+    tsquery = build_tsquery(q)
+    if tsquery is None:
+        return {"items": [], "next_cursor": None}
+
+    results = union_all(
+        _matches(Boat, "boat", tsquery).where(Boat.is_available),
+        _matches(Marina, "marina", tsquery),
+    ).subquery()
+
+    order_by = [results.c.rank, results.c.type, results.c.id]
+    query = select(results)
+    if cursor:
+        values = decode_cursor(cursor, order_by)
+        query = query.where(tuple_(*order_by) < tuple_(*values))
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = (await db.execute(query.order_by(*[c.desc() for c in order_by]).limit(limit + 1))).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last["rank"], last["type"], last["id"]])
+
+    return {"items": rows, "next_cursor": next_cursor}
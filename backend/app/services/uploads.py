@@ -0,0 +1,115 @@
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from pathlib import Path
+import hashlib
+import logging
+import os
+import tempfile
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Assinaturas (magic bytes) dos formatos de imagem aceitos -> extensão
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+
+def detect_image_extension(header: bytes):
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def _create_temp_file(directory: Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=directory, prefix=".upload-", delete=False)
+
+
+def _finalize(temp_path: str, final_path: Path) -> bool:
+    """Move o temporário para o destino; retorna False se o conteúdo já existia."""
+    if final_path.exists():
+        os.unlink(temp_path)
+        return False
+    os.replace(temp_path, final_path)
+    return True
+
+
+class UploadService:
+    """
+    Grava uploads de imagem em UPLOADS_DIR sem carregar o arquivo inteiro
+    na memória e sem I/O bloqueante no event loop.
+
+    O conteúdo é lido em blocos, validado (tamanho e tipo pelo cabeçalho
+    do arquivo) enquanto é gravado num temporário e, ao final, movido
+    atomicamente para um nome derivado do SHA-256 do conteúdo, de modo que
+    imagens idênticas são armazenadas uma única vez.
+    """
+
+    def __init__(self, uploads_dir: str, max_bytes: int, chunk_size: int):
+        self.uploads_dir = Path(uploads_dir)
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+
+    def _too_large(self):
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Arquivo excede o tamanho máximo de {self.max_bytes // (1024 * 1024)}MB",
+        )
+
+    async def save_image(self, file: UploadFile) -> str:
+        """Grava a imagem e retorna a URL pública (/uploads/<sha256>.<ext>)."""
+        if file.size is not None and file.size > self.max_bytes:
+            raise self._too_large()
+
+        temp = await run_in_threadpool(_create_temp_file, self.uploads_dir)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            extension = None
+            while True:
+                chunk = await file.read(self.chunk_size)
+                if not chunk:
+                    break
+                if extension is None:
+                    extension = detect_image_extension(chunk[:16])
+                    if extension is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Formato de imagem não suportado (use JPEG, PNG, GIF ou WebP)",
+                        )
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise self._too_large()
+                digest.update(chunk)
+                await run_in_threadpool(temp.write, chunk)
+            await run_in_threadpool(temp.close)
+
+            if extension is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo vazio")
+
+            filename = f"{digest.hexdigest()}{extension}"
+            created = await run_in_threadpool(_finalize, temp.name, self.uploads_dir / filename)
+            if not created:
+                logger.info("Upload duplicado reaproveitado: %s", filename)
+            return f"/uploads/{filename}"
+        except BaseException:
+            await run_in_threadpool(temp.close)
+            if os.path.exists(temp.name):
+                await run_in_threadpool(os.unlink, temp.name)
+            raise
+
+
+upload_service = UploadService(
+    uploads_dir=settings.UPLOADS_DIR,
+    max_bytes=settings.UPLOAD_MAX_BYTES,
+    chunk_size=settings.UPLOAD_CHUNK_SIZE,
+)
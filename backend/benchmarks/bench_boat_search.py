@@ -0,0 +1,128 @@
+"""
+Benchmark de GET /api/boats/search: consultas com e sem os índices de busca.
+
+Cria o schema temporário bench_boat_search com uma tabela boats de mesma
+estrutura da real, preenche com --rows embarcações (preço, capacidade,
+marina e proprietário aleatórios, ~80% disponíveis) e mede a primeira
+página (--page-size) e uma página profunda (via cursor) de cada
+combinação de filtros usada pela busca, primeiro apenas com a chave
+primária e depois com os índices declarados no modelo Boat (os mesmos da
+migração 2026_10_16_150000).
+
+As consultas medidas são as que a rota monta (build_search_query +
+keyset_query), executadas com o search_path apontando para o schema
+temporário. A coluna "índice" mostra o índice usado pelo plano da primeira
+página: se aparecer "-", o filtro da rota deixou de casar com os índices.
+
+    python benchmarks/bench_boat_search.py --rows 100000
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.schema import CreateIndex
+from app.core.config import settings
+import app.db.base  # noqa: F401  (registra todos os modelos)
+from app.db.models.boat import Boat
+from app.db.pagination import keyset_query, encode_cursor
+from app.routes.boats import build_search_query
+
+SCHEMA = "bench_boat_search"
+
+# Índices de Boat que atendem a busca (o GIN da busca textual fica de fora)
+INDEXES = [index for index in Boat.__table__.indexes if index.name.startswith(("ix_boats_available_", "ix_boats_owner_"))]
+
+# (descrição, parâmetros da rota, posição do cursor da página profunda)
+SCENARIOS = (
+    ("preço crescente", {"sort": "price"}, [2500.0, 0]),
+    ("capacidade 8-12, preço decrescente", {"capacity_min": 8, "capacity_max": 12, "sort": "-price"}, [1500.0, 0]),
+    ("marina, preço crescente", {"marina_id": 7, "sort": "price"}, [2500.0, 0]),
+    ("capacidade decrescente", {"sort": "-capacity"}, [10, 0]),
+    ("proprietário", {"owner_id": 42}, None),
+)
+
+PLAN_INDEX = re.compile(r"(?:Index Scan|Index Only Scan|Bitmap Index Scan) (?:Backward )?(?:using|on) (\w+)")
+
+
+def statement(params: dict, cursor, page_size: int):
+    query, order_by, descending = build_search_query(**params)
+    query, _, _ = keyset_query(query, cursor, page_size, order_by, descending)
+    return query
+
+
+def measure(conn, query, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def plan_index(conn, query) -> str:
+    compiled = query.compile(conn)
+    plan = "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params))
+    indexes = PLAN_INDEX.findall(plan)
+    return ",".join(dict.fromkeys(indexes)) or "-"
+
+
+def run_scenarios(conn, args):
+    results = []
+    for name, params, deep in SCENARIOS:
+        # Proprietário ordena só por id: a página profunda começa no meio da tabela
+        deep_cursor = encode_cursor(deep if deep is not None else [args.rows // 2])
+        first_query = statement(params, None, args.page_size)
+        first = measure(conn, first_query, args.repeat)
+        deep = measure(conn, statement(params, deep_cursor, args.page_size), args.repeat)
+        results.append((name, first, deep, plan_index(conn, first_query)))
+    return results
+
+
+def run(args):
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        # As consultas da rota não qualificam o schema: "boats" passa a ser a tabela do benchmark
+        conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        conn.execute(text("CREATE TABLE boats (LIKE public.boats INCLUDING DEFAULTS)"))
+        conn.execute(text(
+            "INSERT INTO boats (id, name, description, capacity, price_per_day, is_available, owner_id, marina_id) "
+            "SELECT g, 'Lancha ' || g, 'd', 2 + (random() * 28)::int, (100 + random() * 4900)::numeric(10, 2)::float, "
+            "random() < 0.8, 1 + (random() * 999)::int, 1 + (random() * 199)::int "
+            "FROM generate_series(1, :n) AS g"
+        ), {"n": args.rows})
+        conn.execute(text("ALTER TABLE boats ADD PRIMARY KEY (id)"))
+        conn.execute(text("ANALYZE boats"))
+        conn.commit()
+
+        try:
+            before = run_scenarios(conn, args)
+            for index in INDEXES:
+                conn.execute(CreateIndex(index))
+            conn.execute(text("ANALYZE boats"))
+            conn.commit()
+            after = run_scenarios(conn, args)
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+    print(f"{args.rows} embarcações, páginas de {args.page_size}, mediana de {args.repeat} execuções (ms)")
+    print(f"{'cenário':<36} {'1ª pág. sem':>12} {'1ª pág. com':>12} {'profunda sem':>13} {'profunda com':>13}  índice")
+    for (name, first_before, deep_before, _), (_, first_after, deep_after, index) in zip(before, after):
+        print(f"{name:<36} {first_before:>12.2f} {first_after:>12.2f} {deep_before:>13.2f} {deep_after:>13.2f}  {index}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args())
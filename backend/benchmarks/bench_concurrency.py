@@ -0,0 +1,73 @@
+"""
+Benchmark de throughput com requisições concorrentes.
+
+Dispara requisições autenticadas em paralelo contra uma instância da API
+já em execução e mede requisições/segundo e latências. Para comparar o
+antes/depois da camada assíncrona, rode a API com o mesmo número de
+workers nos dois commits, por exemplo:
+
+    uvicorn main:app --workers 1 --port 8000
+    python benchmarks/bench_concurrency.py --username 12345678901 --password 'Senha@123'
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post("/api/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def worker(client: httpx.AsyncClient, path: str, headers: dict, remaining: list, latencies: list, errors: list):
+    while remaining:
+        remaining.pop()
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        token = await login(client, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        remaining = list(range(args.requests))
+        latencies, errors = [], []
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, args.path, headers, remaining, latencies, errors)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"endpoint:      {args.path}")
+    print(f"concorrência:  {args.concurrency}")
+    print(f"requisições:   {len(latencies)} ({len(errors)} erros)")
+    print(f"tempo total:   {elapsed:.2f}s")
+    print(f"throughput:    {len(latencies) / elapsed:.1f} req/s")
+    print(f"latência p50:  {statistics.median(latencies) * 1000:.1f}ms")
+    print(f"latência p95:  {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+    print(f"latência p99:  {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/bookings/")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(run(parser.parse_args()))
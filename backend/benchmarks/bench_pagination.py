@@ -0,0 +1,82 @@
+"""
+Benchmark de paginação: OFFSET vs. keyset (cursor).
+
+Cria uma tabela temporária no banco configurado em .env, preenche com N
+linhas para cada escala e mede a latência de buscar as páginas --pages
+(tamanho --page-size) com OFFSET/LIMIT e com WHERE id > cursor. A
+latência do keyset deve ficar constante enquanto a do OFFSET cresce
+linearmente com a profundidade da página.
+
+    python benchmarks/bench_pagination.py --scales 10000 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+TABLE = "bench_pagination"
+
+
+def measure(conn, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run(args):
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    print(f"páginas de {args.page_size} linhas, mediana de {args.repeat} execuções")
+    print(f"{'linhas':>12} {'página':>8} {'offset (ms)':>12} {'keyset (ms)':>12}")
+    with engine.connect() as conn:
+        for scale in args.scales:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            conn.execute(text(
+                f"CREATE TABLE {TABLE} AS "
+                f"SELECT g AS id, g % 1000 AS user_id, now() - g * interval '1 minute' AS created_at "
+                f"FROM generate_series(1, :n) AS g"
+            ), {"n": scale})
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id)"))
+            conn.execute(text(f"ANALYZE {TABLE}"))
+            conn.commit()
+
+            for page in args.pages:
+                offset = (page - 1) * args.page_size
+                if offset >= scale:
+                    continue
+                # Cursor equivalente ao último id da página anterior
+                cursor = offset
+
+                offset_ms = measure(
+                    conn,
+                    f"SELECT * FROM {TABLE} ORDER BY id OFFSET :offset LIMIT :limit",
+                    {"offset": offset, "limit": args.page_size},
+                    args.repeat,
+                )
+                keyset_ms = measure(
+                    conn,
+                    f"SELECT * FROM {TABLE} WHERE id > :cursor ORDER BY id LIMIT :limit",
+                    {"cursor": cursor, "limit": args.page_size},
+                    args.repeat,
+                )
+                print(f"{scale:>12} {page:>8} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args())
@@ -0,0 +1,107 @@
+"""
+Benchmark de serialização: jsonable_encoder vs. response_model + orjson.
+
+Monta em memória listas de N embarcações e N reservas (com user e boat
+aninhados, como carregados pelos perfis de app/db/loaders.py) e mede o
+caminho antigo (sem response_model: jsonable_encoder introspectando os
+objetos ORM + JSONResponse) contra o atual (validação pelo schema
+declarado, dump em modo JSON do pydantic-core + ORJSONResponse).
+
+Não usa o banco.
+
+    python benchmarks/bench_serialization.py --rows 1000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.db.base  # noqa: F401  (registra todos os modelos)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm.attributes import set_committed_value
+from app.db.models.boat import Boat
+from app.db.models.booking import Booking
+from app.db.models.user import User
+from app.schemas.boat import Boat as BoatSchema
+from app.schemas.booking import Booking as BookingSchema
+
+
+def make_user(i):
+    return User(
+        id=i, username=f"{i:011d}", email=f"user{i}@funntour.com", full_name=f"Usuário {i}",
+        role="cliente", phone="21999990000", whatsapp="21999990000", photo_url="/uploads/x.jpg",
+        hashed_password="$2b$12$" + "x" * 53, is_active=True, is_admin=False, cep="20000000",
+        address="Rua A, 1", created_at=datetime(2025, 1, 1), updated_at=datetime(2025, 1, 1),
+    )
+
+
+def make_boat(i):
+    return Boat(
+        id=i, name=f"Lancha {i}", description="Lancha para 10 pessoas", capacity=10,
+        price_per_day=1500.0, is_available=True, owner_id=1, marina_id=1,
+        main_image_url=f"/uploads/{i:064d}.jpg", gallery_images=["/uploads/a.jpg", "/uploads/b.jpg"],
+        image_variants={"thumbnail": "/uploads/t.webp", "card": "/uploads/c.webp", "full": "/uploads/f.webp"},
+    )
+
+
+def make_bookings(n, users, boats):
+    bookings = []
+    start = datetime(2026, 1, 1)
+    for i in range(n):
+        booking = Booking(
+            id=i + 1, user_id=users[i % len(users)].id, boat_id=boats[i % len(boats)].id,
+            start_date=start + timedelta(days=i), end_date=start + timedelta(days=i + 2),
+            total_price=3000.0, status="confirmed", created_at=start, updated_at=start,
+        )
+        # Sem disparar os eventos de back_populates (evita ciclos user.bookings -> booking -> user)
+        set_committed_value(booking, "user", users[i % len(users)])
+        set_committed_value(booking, "boat", boats[i % len(boats)])
+        bookings.append(booking)
+    return bookings
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run(args):
+    users = [make_user(i) for i in range(1, 51)]
+    boats = [make_boat(i) for i in range(1, args.rows + 1)]
+    bookings = make_bookings(args.rows, users, boats[:100])
+
+    cases = [
+        ("boats", boats, TypeAdapter(List[BoatSchema])),
+        ("bookings", bookings, TypeAdapter(List[BookingSchema])),
+    ]
+    print(f"{args.rows} linhas, mediana de {args.repeat} execuções")
+    print(f"{'lista':>10} {'jsonable_encoder (ms)':>22} {'response_model+orjson (ms)':>27} {'ganho':>7}")
+    for name, rows, adapter in cases:
+        def before():
+            return JSONResponse(content=jsonable_encoder(rows)).body
+
+        def after():
+            validated = adapter.validate_python(rows, from_attributes=True)
+            return ORJSONResponse(content=adapter.dump_python(validated, mode="json")).body
+
+        before_ms = measure(before, args.repeat)
+        after_ms = measure(after, args.repeat)
+        print(f"{name:>10} {before_ms:>22.1f} {after_ms:>27.1f} {before_ms / after_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args())
@@ -0,0 +1,115 @@
+"""
+Benchmark de inicialização da API.
+
+Mede, em processos novos (--runs vezes):
+
+  - import: tempo de `import main` (não deve abrir conexões com o banco);
+  - primeira resposta: do início do processo uvicorn até GET / responder
+    (import + lifespan, incluindo o aquecimento do pool);
+  - primeira consulta: latência do primeiro POST /api/token (usuário
+    inexistente, 401), que já usa uma conexão do pool.
+
+Com --output, grava o resultado em JSON para acompanhar a evolução.
+
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_response(timeout: float) -> tuple:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, "OUTBOX_WORKER_ENABLED": "false"},
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while True:
+                if time.perf_counter() - start > timeout:
+                    raise RuntimeError(f"A API não respondeu em {timeout}s")
+                try:
+                    if client.get("/").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            first_response = time.perf_counter() - start
+
+            query_start = time.perf_counter()
+            client.post("/api/token", data={"username": "bench-startup", "password": "x"})
+            first_query = time.perf_counter() - query_start
+    finally:
+        process.terminate()
+        process.wait()
+    return first_response, first_query
+
+
+def summary(values) -> dict:
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(min(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+    }
+
+
+def run(args):
+    imports, responses, queries = [], [], []
+    for _ in range(args.runs):
+        imports.append(measure_import())
+        first_response, first_query = measure_first_response(args.timeout)
+        responses.append(first_response)
+        queries.append(first_query)
+
+    result = {
+        "runs": args.runs,
+        "import": summary(imports),
+        "first_response": summary(responses),
+        "first_query": summary(queries),
+    }
+    print(f"{args.runs} execuções (ms)")
+    print(f"{'etapa':<20} {'mediana':>9} {'mín':>9} {'máx':>9}")
+    for name in ("import", "first_response", "first_query"):
+        values = result[name]
+        print(f"{name:<20} {values['median_ms']:>9.1f} {values['min_ms']:>9.1f} {values['max_ms']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="arquivo JSON com o resultado")
+    run(parser.parse_args())
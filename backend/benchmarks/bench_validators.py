@@ -0,0 +1,199 @@
+"""
+Micro-benchmarks dos caminhos quentes de validação e serialização.
+
+Casos (lotes de tamanho realista, sem banco):
+
+  - password/*: regra de senha forte de UserCreate/UserUpdate, na versão
+    antiga (cinco passadas pela string + regex) e na atual (check_password,
+    passada única);
+  - cpf_cnpj/*: regex antiga x check_cpf_cnpj;
+  - schema/*: UserCreate e UserUpdate completos, e o dump de uma página de
+    reservas com user e boat aninhados (mesmo caminho das rotas de lista).
+
+Cada caso roda --rounds vezes e reporta mín/mediana/média/desvio por lote.
+O resultado é comparado com o baseline gravado (benchmarks/baselines/
+validators.json); --max-regression faz o script sair com erro se algum caso
+ficar mais lento que o baseline além da tolerância. Baselines dependem da
+máquina: regrave com --save-baseline ao trocar de ambiente.
+
+    python benchmarks/bench_validators.py
+    python benchmarks/bench_validators.py --save-baseline
+    python benchmarks/bench_validators.py --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import string
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+import app.db.base  # noqa: F401  (registra todos os modelos)
+from app.schemas.booking import Booking as BookingSchema
+from app.schemas.common import Page
+from app.schemas.user import UserCreate, UserUpdate, check_password, check_cpf_cnpj
+from bench_serialization import make_user, make_boat, make_bookings
+
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baselines", "validators.json")
+
+VALIDATOR_BATCH = 10_000
+SCHEMA_BATCH = 1_000
+PAGE_SIZE = 100
+
+
+# Implementações anteriores, mantidas como referência
+
+def legacy_password(v):
+    if not v:
+        return v
+    if len(v) < 8:
+        raise ValueError('A senha deve ter no mínimo 8 caracteres')
+    if not any(c.isupper() for c in v):
+        raise ValueError('A senha deve conter pelo menos 1 caractere maiúsculo')
+    if not any(c.islower() for c in v):
+        raise ValueError('A senha deve conter pelo menos 1 caractere minúsculo')
+    if not any(c.isdigit() for c in v):
+        raise ValueError('A senha deve conter pelo menos 1 número')
+    if not re.search('[!@#$%^&*(),.?":{}|<>]', v):
+        raise ValueError('A senha deve conter pelo menos 1 caractere especial')
+    return v
+
+
+def legacy_cpf_cnpj(v):
+    if not re.match(r'^\d{11}$|^\d{14}$', v):
+        raise ValueError('CPF/CNPJ inválido')
+    return v
+
+
+def make_passwords(rng, n):
+    """~80% senhas válidas (8-20 caracteres), o resto com alguma regra violada."""
+    passwords = []
+    for _ in range(n):
+        length = rng.randint(8, 20)
+        password = [rng.choice(string.ascii_lowercase) for _ in range(length - 3)]
+        password += [rng.choice(string.ascii_uppercase), rng.choice(string.digits), rng.choice("!@#$%&*.")]
+        rng.shuffle(password)
+        password = "".join(password)
+        if rng.random() < 0.2:
+            password = rng.choice((password[:6], password.lower(), password.upper(), re.sub(r"[^\w]", "x", password)))
+        passwords.append(password)
+    return passwords
+
+
+def make_documents(rng, n):
+    return [
+        "".join(rng.choice(string.digits) for _ in range(rng.choice((11, 14, 11, 11, 10))))
+        for _ in range(n)
+    ]
+
+
+def make_user_payloads(rng, n):
+    return [
+        {
+            "username": f"{rng.randrange(10 ** 10, 10 ** 11)}", "email": f"user{i}@funntour.com",
+            "full_name": f"Usuário {i}", "role": "cliente", "phone": "21999990000",
+            "whatsapp": "21999990000", "photo_url": "/uploads/x.jpg", "cep": "20000000",
+            "address": "Rua A, 1", "password": f"Senha@{i:04d}",
+        }
+        for i in range(n)
+    ]
+
+
+def run_all(validate, values):
+    for value in values:
+        try:
+            validate(value)
+        except ValueError:
+            pass
+
+
+def build_cases(rng):
+    passwords = make_passwords(rng, VALIDATOR_BATCH)
+    documents = make_documents(rng, VALIDATOR_BATCH)
+    payloads = make_user_payloads(rng, SCHEMA_BATCH)
+    updates = [{"full_name": p["full_name"], "password": p["password"]} for p in payloads]
+
+    users = [make_user(i) for i in range(1, 51)]
+    boats = [make_boat(i) for i in range(1, PAGE_SIZE + 1)]
+    page = {"items": make_bookings(PAGE_SIZE, users, boats), "next_cursor": "eyJ2IjpbMTAwXX0"}
+    page_adapter = Page[BookingSchema]
+
+    return {
+        "password/legacy": lambda: run_all(legacy_password, passwords),
+        "password/single_pass": lambda: run_all(check_password, passwords),
+        "cpf_cnpj/legacy": lambda: run_all(legacy_cpf_cnpj, documents),
+        "cpf_cnpj/single_pass": lambda: run_all(check_cpf_cnpj, documents),
+        "schema/user_create": lambda: [UserCreate.model_validate(p) for p in payloads],
+        "schema/user_update": lambda: [UserUpdate.model_validate(p) for p in updates],
+        "schema/booking_page_dump": lambda: page_adapter.model_validate(page, from_attributes=True).model_dump_json(),
+    }
+
+
+def measure(fn, rounds: int) -> dict:
+    fn()  # aquecimento
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min_ms": round(min(timings) * 1000, 4),
+        "median_ms": round(statistics.median(timings) * 1000, 4),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+        "stddev_ms": round(statistics.stdev(timings) * 1000, 4) if len(timings) > 1 else 0.0,
+    }
+
+
+def run(args):
+    cases = build_cases(random.Random(args.seed))
+    selected = {name: fn for name, fn in cases.items() if not args.filter or args.filter in name}
+    results = {name: measure(fn, args.rounds) for name, fn in selected.items()}
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)["results"]
+
+    print(f"lotes: validadores {VALIDATOR_BATCH}, schemas {SCHEMA_BATCH}, página {PAGE_SIZE}; {args.rounds} rodadas (ms)")
+    print(f"{'caso':<28} {'mín':>9} {'mediana':>9} {'média':>9} {'desvio':>8} {'baseline':>9} {'Δ':>7}")
+    regressions = []
+    for name, r in results.items():
+        reference = baseline.get(name, {}).get("median_ms")
+        delta = (r["median_ms"] / reference - 1) if reference else None
+        if delta is not None and args.max_regression is not None and delta > args.max_regression:
+            regressions.append(name)
+        print(
+            f"{name:<28} {r['min_ms']:>9.3f} {r['median_ms']:>9.3f} {r['mean_ms']:>9.3f} {r['stddev_ms']:>8.3f} "
+            f"{reference if reference is not None else '-':>9} {f'{delta:+.0%}' if delta is not None else '-':>7}"
+        )
+
+    for prefix in ("password", "cpf_cnpj"):
+        legacy, current = results.get(f"{prefix}/legacy"), results.get(f"{prefix}/single_pass")
+        if legacy and current:
+            print(f"{prefix}: passada única {legacy['median_ms'] / current['median_ms']:.1f}x mais rápida")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"rounds": args.rounds, "seed": args.seed, "results": {**baseline, **results}}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline gravado em {os.path.relpath(BASELINE_PATH)}")
+
+    if regressions:
+        print(f"Regressão acima de {args.max_regression:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--filter", help="roda apenas os casos cujo nome contém o texto")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--max-regression", type=float, help="tolerância sobre a mediana do baseline (ex.: 0.2)")
+    run(parser.parse_args())
@@ -0,0 +1,119 @@
+"""
+Verificação dos orçamentos de consultas (query_budget) com QUERY_BUDGET_MODE=raise.
+
+Para cada endpoint de BUDGET_ENDPOINTS, confere que:
+
+  1. a requisição responde 200, ou seja, a rota continua dentro do
+     orçamento que declara;
+  2. com o orçamento da rota trocado por zero (dependency_overrides), a
+     mesma requisição responde 500, ou seja, o modo raise de fato muda a
+     resposta enviada ao cliente, e o 500 traz os cabeçalhos de CORS (um
+     navegador consegue ler o erro).
+
+Roda em processo, contra main.app (httpx.ASGITransport, com o lifespan da
+aplicação), com o cache de respostas desligado para que toda requisição
+chegue ao banco. Por padrão autentica como o admin gerado por
+seed_data.py; --username/--password permitem usar outro admin.
+
+Sai com código 1 se algum endpoint falhar.
+
+    python benchmarks/seed_data.py --reset --boats 1000 --bookings 10000
+    python benchmarks/check_query_budgets.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Antes de importar a aplicação: o middleware lê o modo das configurações
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+
+import httpx
+from check_query_counts import seed_admin
+from seed_data import SEED_PASSWORD
+
+# Origem de um navegador: as respostas devem trazer Access-Control-Allow-Origin
+ORIGIN = "http://frontend.check"
+
+# (path, parâmetros) das rotas GET com orçamento declarado e sem parâmetros no path
+BUDGET_ENDPOINTS = (
+    ("/api/boats/", {}),
+    ("/api/boats/search", {"sort": "price"}),
+    ("/api/boats/available", {"start": "2030-01-01T00:00:00", "end": "2030-01-08T00:00:00"}),
+    ("/api/marinas/", {}),
+    ("/api/marinas/nearby", {"lat": -23.0, "lon": -44.3}),
+    ("/api/bookings/", {}),
+    ("/api/partner-prices/", {}),
+    ("/api/users/", {}),
+    ("/api/search", {"q": "lancha"}),
+)
+
+
+def budget_dependency(app, path: str):
+    """Dependência query_budget(...) declarada pela rota GET `path`."""
+    for route in app.routes:
+        if getattr(route, "path", None) == path and "GET" in route.methods:
+            for dependency in route.dependant.dependencies:
+                if dependency.call.__qualname__.startswith("query_budget."):
+                    return dependency.call
+    raise RuntimeError(f"{path} não declara query_budget")
+
+
+async def check_endpoint(client, app, path: str, params: dict, headers) -> str:
+    """Retorna a mensagem de erro, ou None se o orçamento se comporta como esperado."""
+    from app.core.metrics import query_budget
+
+    response = await client.get(path, params=params, headers=headers)
+    if response.status_code != 200:
+        return f"dentro do orçamento: HTTP {response.status_code} {response.text[:200]}"
+
+    app.dependency_overrides[budget_dependency(app, path)] = query_budget(0)
+    try:
+        response = await client.get(path, params=params, headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+    if response.status_code != 500:
+        return f"orçamento zero: esperado HTTP 500, recebido {response.status_code}"
+    if "access-control-allow-origin" not in response.headers:
+        return "orçamento zero: HTTP 500 sem cabeçalhos de CORS"
+    print(f"{path:<24} ok")
+    return None
+
+
+async def run(args):
+    # Importado aqui: main conecta os engines configurados pelo ambiente atual
+    import main
+    from app.db.base import AsyncSessionLocal
+    from app.core.response_cache import response_cache
+    from app.core.rate_limit import rate_limiter
+
+    username = args.username or await seed_admin(AsyncSessionLocal)
+    password = args.password or SEED_PASSWORD
+    response_cache.enabled = False
+    rate_limiter.enabled = False
+
+    failures = []
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=60.0) as client:
+            response = await client.post("/api/token", data={"username": username, "password": password})
+            if response.status_code != 200:
+                raise RuntimeError(f"Login de {username} falhou: HTTP {response.status_code}")
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}", "Origin": ORIGIN}
+            for path, params in BUDGET_ENDPOINTS:
+                error = await check_endpoint(client, main.app, path, params, headers)
+                if error is not None:
+                    print(f"{path:<24} FALHA  {error}")
+                    failures.append(path)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--username", help="admin usado nas requisições (padrão: admin do seed)")
+    parser.add_argument("--password", help=f"senha do admin (padrão: {SEED_PASSWORD})")
+    asyncio.run(run(parser.parse_args()))
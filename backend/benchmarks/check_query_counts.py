@@ -0,0 +1,103 @@
+"""
+Verificação de N+1 nas listagens com relacionamentos aninhados.
+
+Para cada endpoint de LIST_ENDPOINTS (reservas, preços de parceiros e
+marinas), usa app.db.query_counter.assert_constant_query_count para
+conferir que a quantidade de consultas SQL é a mesma em cada tamanho de
+página de --page-sizes, ou seja, que os perfis de carregamento de
+app/db/loaders.py continuam evitando um lazy load por linha.
+
+Roda em processo, contra main.app (httpx.ASGITransport, com o lifespan da
+aplicação), com o cache de respostas desligado para que toda requisição
+chegue ao banco. Por padrão autentica como o admin gerado por
+seed_data.py; --username/--password permitem usar outro admin. Uma página
+maior só prova algo se trouxer mais linhas que a menor: endpoints sem
+dados suficientes também contam como falha.
+
+Sai com código 1 se algum endpoint falhar.
+
+    python benchmarks/seed_data.py --reset --boats 1000 --bookings 10000
+    python benchmarks/check_query_counts.py
+    python benchmarks/check_query_counts.py --page-sizes 1 10 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import text
+from app.db.query_counter import assert_constant_query_count
+from seed_data import SEED_PASSWORD, SEED_EMAIL_DOMAIN
+
+LIST_ENDPOINTS = ("/api/bookings/", "/api/partner-prices/", "/api/marinas/")
+
+
+async def seed_admin(session_factory) -> str:
+    async with session_factory() as db:
+        admin = (await db.execute(text(
+            "SELECT username FROM users WHERE email LIKE :domain AND is_admin ORDER BY id LIMIT 1"
+        ), {"domain": f"%@{SEED_EMAIL_DOMAIN}"})).scalar()
+    if admin is None:
+        raise RuntimeError("Admin do seed não encontrado; rode seed_data.py ou informe --username/--password")
+    return admin
+
+
+async def check_endpoint(client, path: str, page_sizes, headers) -> str:
+    """Retorna a mensagem de erro, ou None se a contagem for constante."""
+    response = await client.get(path, params={"limit": page_sizes[-1]}, headers=headers)
+    if response.status_code != 200:
+        return f"HTTP {response.status_code} {response.text[:200]}"
+    items = len(response.json()["items"])
+    if items <= page_sizes[0]:
+        return f"dados insuficientes ({items} itens com limit={page_sizes[-1]})"
+    try:
+        counts = await assert_constant_query_count(client, path, page_sizes, headers=headers)
+    except AssertionError as e:
+        return str(e)
+    print(f"{path:<24} ok  {counts}")
+    return None
+
+
+async def run(args):
+    # Importado aqui: main conecta os engines configurados pelo ambiente atual
+    import main
+    from app.db.base import AsyncSessionLocal
+    from app.core.response_cache import response_cache
+    from app.core.rate_limit import rate_limiter
+
+    username = args.username or await seed_admin(AsyncSessionLocal)
+    password = args.password or SEED_PASSWORD
+    page_sizes = sorted(set(args.page_sizes))
+    response_cache.enabled = False
+    rate_limiter.enabled = False
+
+    failures = []
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=60.0) as client:
+            response = await client.post("/api/token", data={"username": username, "password": password})
+            if response.status_code != 200:
+                raise RuntimeError(f"Login de {username} falhou: HTTP {response.status_code}")
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            for path in LIST_ENDPOINTS:
+                error = await check_endpoint(client, path, page_sizes, headers)
+                if error is not None:
+                    print(f"{path:<24} FALHA  {error}")
+                    failures.append(path)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[1, 50], help="pelo menos dois tamanhos")
+    parser.add_argument("--username", help="admin usado nas requisições (padrão: admin do seed)")
+    parser.add_argument("--password", help=f"senha do admin (padrão: {SEED_PASSWORD})")
+    args = parser.parse_args()
+    if len(set(args.page_sizes)) < 2:
+        parser.error("--page-sizes precisa de pelo menos dois tamanhos diferentes")
+    asyncio.run(run(args))
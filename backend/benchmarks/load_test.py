@@ -0,0 +1,292 @@
+"""
+Teste de carga roteirizado contra a API.
+
+Por padrão roda em processo, contra main.app (httpx.ASGITransport, com o
+lifespan da aplicação); com --base-url, contra uma instância já em
+execução. Usa os usuários e embarcações gerados por seed_data.py
+(emails @funntour.test, senha SEED_PASSWORD).
+
+Cada usuário virtual faz login como um cliente e, até o fim de
+--duration, sorteia (com --seed) um dos cenários pelos pesos de
+SCENARIOS: login, busca de embarcações (com a página seguinte pelo
+cursor), criação de reserva e as listagens administrativas de usuários
+e reservas. As reservas criadas são removidas no final (exceto com
+--keep-bookings), para que execuções seguidas partam do mesmo estado.
+
+Em processo, o rate limiter de login fica desligado (todos os usuários
+virtuais saem do mesmo IP); contra uma instância externa, suba-a com
+RATE_LIMIT_ENABLED=false.
+
+O relatório (JSON, chaves ordenadas para facilitar o diff entre commits)
+traz, por endpoint, requisições, status, erros, throughput e latências
+p50/p95/p99/máx.
+
+    python benchmarks/seed_data.py --reset --boats 100000 --bookings 5000000
+    python benchmarks/load_test.py --duration 60 --concurrency 50 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import text
+from seed_data import SEED_PASSWORD, SEED_EMAIL_DOMAIN
+
+# (cenário, peso)
+SCENARIOS = (
+    ("login", 1),
+    ("list_boats", 6),
+    ("create_booking", 2),
+    ("admin_list_users", 1),
+    ("admin_list_bookings", 1),
+)
+SAMPLE_USERS = 500
+SAMPLE_BOATS = 2000
+PAGE_SIZE = 20
+BOAT_SORTS = ("id", "price", "-price", "-capacity")
+
+# Status esperados além de 2xx (ex.: conflito de reserva não é erro do servidor)
+EXPECTED_STATUSES = {"POST /api/bookings/": {409}}
+
+# Reservas do teste ficam bem no futuro, longe das geradas pelo seed
+BOOKING_BASE_DATE = datetime(2035, 1, 1)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def record(self, endpoint: str, status, seconds: float):
+        self.latencies.append(seconds)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if not isinstance(status, int) or (status >= 400 and status not in EXPECTED_STATUSES.get(endpoint, ())):
+            self.errors += 1
+
+    def report(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        if len(latencies) >= 2:
+            percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(p50 * 1000, 2),
+                "p95": round(p95 * 1000, 2),
+                "p99": round(p99 * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+                "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            },
+        }
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args, users: list, admin: str, boat_ids: list):
+        self.client = client
+        self.args = args
+        self.users = users
+        self.admin = admin
+        self.boat_ids = boat_ids
+        self.stats = {}
+        self.created_bookings = []
+        self.admin_headers = None
+
+    async def request(self, method: str, path: str, endpoint: str = None, **kwargs):
+        endpoint = endpoint or f"{method} {path}"
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        self.stats.setdefault(endpoint, EndpointStats()).record(endpoint, status, time.perf_counter() - start)
+        return response
+
+    async def login(self, username: str):
+        response = await self.request(
+            "POST", "/api/token", data={"username": username, "password": SEED_PASSWORD}
+        )
+        if response is None or response.status_code != 200:
+            return None
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def list_boats(self, rng, headers):
+        # Listagem de clientes (GET /api/boats/ é restrita a admins)
+        params = {"limit": PAGE_SIZE, "sort": rng.choice(BOAT_SORTS)}
+        response = await self.request("GET", "/api/boats/search", params=params, headers=headers)
+        if response is not None and response.status_code == 200 and rng.random() < 0.5:
+            cursor = response.json().get("next_cursor")
+            if cursor:
+                await self.request(
+                    "GET", "/api/boats/search", endpoint="GET /api/boats/search (cursor)",
+                    params={**params, "cursor": cursor}, headers=headers,
+                )
+
+    async def create_booking(self, rng, headers):
+        start = BOOKING_BASE_DATE + timedelta(days=rng.randrange(0, 3650), hours=rng.randrange(0, 24))
+        response = await self.request("POST", "/api/bookings/", headers=headers, json={
+            "boat_id": rng.choice(self.boat_ids),
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.randint(1, 3))).isoformat(),
+            # Exigidos pelo schema; o preço e o status são definidos pela API
+            "total_price": 0,
+            "status": "pending",
+        })
+        if response is not None and response.status_code == 200:
+            self.created_bookings.append(response.json()["id"])
+
+    async def virtual_user(self, index: int, deadline: float):
+        rng = random.Random(f"{self.args.seed}-{index}")
+        headers = await self.login(rng.choice(self.users))
+        if headers is None:
+            return
+        names, weights = zip(*SCENARIOS)
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            if scenario == "login":
+                headers = await self.login(rng.choice(self.users)) or headers
+            elif scenario == "list_boats":
+                await self.list_boats(rng, headers)
+            elif scenario == "create_booking":
+                await self.create_booking(rng, headers)
+            elif scenario == "admin_list_users":
+                await self.request("GET", "/api/users/", params={"limit": 50}, headers=self.admin_headers)
+            elif scenario == "admin_list_bookings":
+                await self.request("GET", "/api/bookings/", params={"limit": 50}, headers=self.admin_headers)
+
+    async def run(self) -> float:
+        self.admin_headers = await self.login(self.admin)
+        if self.admin_headers is None:
+            raise RuntimeError(f"Login do admin {self.admin} falhou; rode seed_data.py antes")
+        # O aquecimento (logins iniciais do admin) não entra no relatório
+        self.stats.clear()
+        start = time.perf_counter()
+        deadline = start + self.args.duration
+        await asyncio.gather(*[self.virtual_user(i, deadline) for i in range(self.args.concurrency)])
+        return time.perf_counter() - start
+
+
+async def load_fixtures(session_factory, seed: int):
+    """Usuários (clientes), admin e embarcações disponíveis gerados pelo seed."""
+    async with session_factory() as db:
+        await db.execute(text("SELECT setseed(:seed)"), {"seed": (seed % 1000) / 1000})
+        users = (await db.execute(text(
+            "SELECT username FROM users WHERE email LIKE :domain AND role = 'cliente' ORDER BY random() LIMIT :n"
+        ), {"domain": f"%@{SEED_EMAIL_DOMAIN}", "n": SAMPLE_USERS})).scalars().all()
+        admin = (await db.execute(text(
+            "SELECT username FROM users WHERE email LIKE :domain AND is_admin ORDER BY id LIMIT 1"
+        ), {"domain": f"%@{SEED_EMAIL_DOMAIN}"})).scalar()
+        boat_ids = (await db.execute(text(
+            "SELECT id FROM boats WHERE is_available ORDER BY random() LIMIT :n"
+        ), {"n": SAMPLE_BOATS})).scalars().all()
+        counts = {
+            table: (await db.execute(text(f"SELECT reltuples::bigint FROM pg_class WHERE relname = '{table}'"))).scalar()
+            for table in ("users", "marinas", "boats", "bookings", "partner_prices")
+        }
+    if not users or not admin or not boat_ids:
+        raise RuntimeError("Massa de dados não encontrada; rode benchmarks/seed_data.py antes")
+    return sorted(users), admin, sorted(boat_ids), counts
+
+
+async def delete_bookings(session_factory, booking_ids: list):
+    if not booking_ids:
+        return
+    async with session_factory() as db:
+        await db.execute(text("DELETE FROM bookings WHERE id = ANY(:ids)"), {"ids": booking_ids})
+        await db.commit()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    # Importado aqui: main conecta os engines configurados pelo ambiente atual
+    import main
+    from app.db.base import AsyncSessionLocal
+    from app.core.rate_limit import rate_limiter
+
+    users, admin, boat_ids, counts = await load_fixtures(AsyncSessionLocal, args.seed)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60.0)
+        lifespan = None
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest", timeout=60.0)
+        lifespan = main.lifespan(main.app)
+        rate_limiter.enabled = False
+
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        async with client:
+            test = LoadTest(client, args, users, admin, boat_ids)
+            elapsed = await test.run()
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    if not args.keep_bookings:
+        await delete_bookings(AsyncSessionLocal, test.created_bookings)
+
+    endpoints = {name: stats.report(elapsed) for name, stats in sorted(test.stats.items())}
+    total = sum(e["requests"] for e in endpoints.values())
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.base_url or "main.app (ASGI)",
+        "config": {"duration": args.duration, "concurrency": args.concurrency, "seed": args.seed},
+        "dataset": counts,
+        "elapsed_seconds": round(elapsed, 2),
+        "total": {
+            "requests": total,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        },
+        "endpoints": endpoints,
+    }
+
+    print(f"{total} requisições em {elapsed:.1f}s ({report['total']['throughput_rps']} req/s)")
+    print(f"{'endpoint':<36} {'req':>7} {'erros':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, e in endpoints.items():
+        latency = e["latency_ms"]
+        print(
+            f"{name:<36} {e['requests']:>7} {e['errors']:>6} {e['throughput_rps']:>8.1f} "
+            f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos de carga")
+    parser.add_argument("--concurrency", type=int, default=20, help="usuários virtuais")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", help="API já em execução (padrão: main.app em processo)")
+    parser.add_argument("--keep-bookings", action="store_true", help="não remover as reservas criadas")
+    parser.add_argument("--output", help="arquivo JSON com o relatório")
+    asyncio.run(run(parser.parse_args()))
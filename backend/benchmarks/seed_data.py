@@ -0,0 +1,223 @@
+"""
+Gerador de massa de dados sintética para testes de carga.
+
+Preenche users, marinas, boats, bookings e partner_prices na escala pedida,
+carregando por COPY (asyncpg copy_records_to_table) em lotes. A geração é
+determinística para um mesmo --seed e o mesmo estado inicial do banco.
+
+Os ids continuam a partir do maior id existente de cada tabela, então o
+script pode rodar sobre um banco com dados; --reset esvazia as tabelas
+antes (TRUNCATE ... RESTART IDENTITY CASCADE). Todos os usuários gerados
+têm email @funntour.test e a senha SEED_PASSWORD; o primeiro é admin e
+cerca de 10% são parceiros (donos das embarcações).
+
+As reservas de cada embarcação são geradas em sequência, sem sobreposição,
+respeitando a constraint bookings_no_overlap.
+
+    python benchmarks/seed_data.py --users 10000 --marinas 500 --boats 100000 \\
+        --bookings 5000000 --partner-prices 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+from app.core.config import settings
+from app.core.security import get_password_hash
+
+SEED_PASSWORD = "Senha@123"
+SEED_EMAIL_DOMAIN = "funntour.test"
+# Usernames (CPF) dos usuários gerados: USERNAME_BASE + id
+USERNAME_BASE = 90_000_000_000
+
+BASE_DATE = datetime(2024, 1, 1)
+CHUNK_ROWS = 50_000
+
+TABLES = ("users", "marinas", "boats", "bookings", "partner_prices")
+
+BOAT_KINDS = ("Lancha", "Veleiro", "Iate", "Catamarã", "Jet ski", "Escuna")
+BOAT_DESCRIPTIONS = (
+    "Embarcação completa com som e churrasqueira",
+    "Ideal para passeios em família",
+    "Perfeita para pesca esportiva",
+    "Conforto para passeios ao pôr do sol",
+    "Rápida e econômica para travessias curtas",
+)
+MARINA_SERVICES = ("combustivel", "restaurante", "estacionamento", "manutencao", "guarda", "wifi", "loja")
+BOOKING_STATUSES = ("pending", "confirmed", "completed", "cancelled")
+
+
+def chunks(rows, size: int = CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_users(rng, first_id: int, count: int, hashed_password: str):
+    for user_id in range(first_id, first_id + count):
+        created_at = BASE_DATE - timedelta(minutes=rng.randrange(0, 2 * 365 * 24 * 60))
+        if user_id == first_id:
+            role, is_admin = "admin", True
+        else:
+            role, is_admin = ("parceiro" if rng.random() < 0.1 else "cliente"), False
+        yield (
+            user_id, str(USERNAME_BASE + user_id), f"seed{user_id}@{SEED_EMAIL_DOMAIN}", hashed_password,
+            f"Usuário {user_id}", role, None, f"21 9{rng.randrange(10 ** 7, 10 ** 8)}", None, "",
+            True, is_admin, "", "", created_at, created_at,
+        )
+
+
+def generate_marinas(rng, first_id: int, count: int):
+    for marina_id in range(first_id, first_id + count):
+        services = sorted(rng.sample(MARINA_SERVICES, rng.randint(1, 4)))
+        yield (
+            marina_id, f"Marina {marina_id}", "Marina com " + ", ".join(services),
+            rng.uniform(-30.0, -3.0), rng.uniform(-50.0, -35.0), f"Avenida Beira-Mar, {marina_id}",
+            None, f"marina{marina_id}@{SEED_EMAIL_DOMAIN}", json.dumps(services), None, None,
+        )
+
+
+def generate_boats(rng, first_id: int, count: int, owner_ids: list, marina_ids: list, prices: dict):
+    for boat_id in range(first_id, first_id + count):
+        price = round(rng.uniform(100, 5000), 2)
+        prices[boat_id] = price
+        yield (
+            boat_id, f"{rng.choice(BOAT_KINDS)} {boat_id}", rng.choice(BOAT_DESCRIPTIONS),
+            rng.randint(2, 30), price, rng.random() < 0.9, rng.choice(owner_ids),
+            rng.choice(marina_ids) if marina_ids else None, None, None,
+        )
+
+
+def generate_bookings(rng, first_id: int, count: int, user_ids: list, boat_ids: list, prices: dict):
+    # Reserva i vai para a embarcação i % n, no slot i // n: slots de 4 dias não se sobrepõem
+    for offset in range(count):
+        boat_id = boat_ids[offset % len(boat_ids)]
+        start = BASE_DATE + timedelta(days=4 * (offset // len(boat_ids)))
+        days = rng.randint(1, 3)
+        created_at = start - timedelta(days=rng.randint(1, 60))
+        yield (
+            first_id + offset, rng.choice(user_ids), boat_id, start, start + timedelta(days=days),
+            round(days * prices[boat_id], 2), rng.choice(BOOKING_STATUSES), created_at, created_at,
+        )
+
+
+def generate_partner_prices(rng, first_id: int, count: int, boat_owners: dict, prices: dict):
+    boat_ids = list(boat_owners)
+    for price_id in range(first_id, first_id + count):
+        boat_id = rng.choice(boat_ids)
+        start = BASE_DATE + timedelta(days=rng.randrange(0, 730))
+        yield (
+            price_id, boat_owners[boat_id], boat_id, round(prices[boat_id] * rng.uniform(0.7, 1.3), 2),
+            start, start + timedelta(days=rng.randint(7, 30)),
+        )
+
+
+COLUMNS = {
+    "users": (
+        "id", "username", "email", "hashed_password", "full_name", "role", "phone", "whatsapp",
+        "birth_date", "photo_url", "is_active", "is_admin", "cep", "address", "created_at", "updated_at",
+    ),
+    "marinas": (
+        "id", "name", "description", "latitude", "longitude", "address", "contact_phone",
+        "contact_email", "services", "main_image_url", "gallery_images",
+    ),
+    "boats": (
+        "id", "name", "description", "capacity", "price_per_day", "is_available", "owner_id",
+        "marina_id", "main_image_url", "gallery_images",
+    ),
+    "bookings": (
+        "id", "user_id", "boat_id", "start_date", "end_date", "total_price", "status", "created_at", "updated_at",
+    ),
+    "partner_prices": ("id", "partner_id", "boat_id", "price", "start_date", "end_date"),
+}
+
+
+async def copy_rows(conn, table: str, rows) -> int:
+    start = time.perf_counter()
+    total = 0
+    for chunk in chunks(rows):
+        await conn.copy_records_to_table(table, records=chunk, columns=COLUMNS[table])
+        total += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{table:<16} {total:>10} linhas em {elapsed:>7.1f}s ({total / elapsed if elapsed else 0:,.0f} linhas/s)")
+    return total
+
+
+async def next_id(conn, table: str) -> int:
+    return await conn.fetchval(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    conn = await asyncpg.connect(settings.SQLALCHEMY_DATABASE_URI)
+    try:
+        if args.reset:
+            await conn.execute(f"TRUNCATE {', '.join(TABLES)}, notification_outbox RESTART IDENTITY CASCADE")
+
+        started = time.perf_counter()
+        async with conn.transaction():
+            first = {table: await next_id(conn, table) for table in TABLES}
+
+            # Um único hash: bcrypt por usuário tornaria a geração inviável
+            hashed_password = get_password_hash(SEED_PASSWORD)
+            await copy_rows(conn, "users", generate_users(rng, first["users"], args.users, hashed_password))
+            user_ids = list(range(first["users"], first["users"] + args.users))
+            partner_ids = [
+                row["id"] for row in await conn.fetch(
+                    "SELECT id FROM users WHERE id >= $1 AND role IN ('parceiro', 'admin') ORDER BY id", first["users"]
+                )
+            ]
+
+            await copy_rows(conn, "marinas", generate_marinas(rng, first["marinas"], args.marinas))
+            marina_ids = list(range(first["marinas"], first["marinas"] + args.marinas))
+
+            prices = {}
+            boat_owners = {}
+            boats = generate_boats(rng, first["boats"], args.boats, partner_ids, marina_ids, prices)
+            await copy_rows(conn, "boats", boats)
+            for row in await conn.fetch("SELECT id, owner_id FROM boats WHERE id >= $1", first["boats"]):
+                boat_owners[row["id"]] = row["owner_id"]
+
+            if args.boats:
+                boat_ids = sorted(boat_owners)
+                await copy_rows(conn, "bookings", generate_bookings(rng, first["bookings"], args.bookings, user_ids, boat_ids, prices))
+                await copy_rows(conn, "partner_prices", generate_partner_prices(rng, first["partner_prices"], args.partner_prices, boat_owners, prices))
+
+            # COPY com ids explícitos não avança as sequências
+            for table in TABLES:
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                )
+
+        for table in TABLES:
+            await conn.execute(f"ANALYZE {table}")
+        print(f"Concluído em {time.perf_counter() - started:.1f}s; admin: {USERNAME_BASE + first['users']} / {SEED_PASSWORD}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--marinas", type=int, default=500)
+    parser.add_argument("--boats", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--partner-prices", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="esvazia as tabelas antes de gerar (apaga todos os dados)")
+    args = parser.parse_args()
+    if args.users < 1:
+        parser.error("--users deve ser pelo menos 1 (o admin e os donos das embarcações)")
+    asyncio.run(run(args))
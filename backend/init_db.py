@@ -1,8 +1,15 @@
 from app.db.base import Base
 from app.db.session import engine
-from app.db.models import user  # Import all models
 
 def init_db():
+    """
+    Cria as tabelas que ainda não existem a partir dos modelos, junto com
+    as extensões (unaccent, btree_gist), funções, triggers e constraints
+    de app/db/ddl.py.
+
+    Passo explícito de instalação: a aplicação não cria mais o esquema ao
+    ser importada. Em bancos já existentes, use `alembic upgrade head`.
+    """
     Base.metadata.create_all(bind=engine)
     print("Database initialized successfully!")
 
@@ -1,13 +1,47 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import users, boats, bookings, auth, marinas, partner_prices
+from app.routes import users, boats, bookings, auth, marinas, partner_prices, search
+from app.services.password_hasher import password_hasher
+from app.services.image_variants import image_variant_service
+from app.services.notification_worker import outbox_worker
+from app.services.availability import availability_index
+from app.db.session import warm_up
+from app.db.pool import pool_stats
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import response_cache
+from app.core.rate_limit import rate_limiter
+from app.core.metrics import metrics, MetricsMiddleware, QueryBudgetMiddleware, CONTENT_TYPE
+from app.core.config import get_settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Conexões e mappers prontos antes da primeira requisição (o import não toca no banco)
+    await warm_up()
+    # Worker de entrega das notificações (pode rodar separado com OUTBOX_WORKER_ENABLED=false)
+    if get_settings().OUTBOX_WORKER_ENABLED:
+        outbox_worker.start()
+    # Recarga periódica do índice de disponibilidade fora do caminho das requisições
+    availability_index.start()
+    yield
+    await availability_index.stop()
+    await outbox_worker.stop()
+    # Encerrar os pools de processos
+    password_hasher.shutdown()
+    image_variant_service.shutdown()
 
 app = FastAPI(
     title="Funntour API",
     description="API para sistema de gerenciamento de embarcações e rotas",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Dentro do CORS: o 500 do modo raise também leva os cabeçalhos de CORS
+app.add_middleware(QueryBudgetMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +51,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Mais externo: a latência medida inclui os demais middlewares
+app.add_middleware(MetricsMiddleware)
+
+if get_settings().METRICS_ENABLED:
+    metrics.register_collector(
+        "password_hasher", password_hasher.stats,
+        counters=("completed", "rejected", "queue_wait_seconds_total", "hash_seconds_total"),
+    )
+    metrics.register_collector("principal_cache", principal_cache.stats, counters=("hits", "misses", "invalidations"))
+    metrics.register_collector(
+        "response_cache", response_cache.stats, counters=("hits", "misses", "not_modified", "invalidations")
+    )
+    metrics.register_collector("outbox", outbox_worker.stats, counters=("sent", "retried", "failed"))
+    metrics.register_collector("rate_limit", rate_limiter.stats, counters=("allowed", "rejected", "backend_errors"))
+    metrics.register_collector("db_pool", pool_stats, label="engine", counters=("checkouts", "timeouts"))
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return Response(metrics.render(), media_type=CONTENT_TYPE)
+
 # Include all routers
 app.include_router(auth.router, prefix="/api", tags=["auth"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
@@ -24,6 +78,7 @@ app.include_router(boats.router, prefix="/api/boats", tags=["boats"])
 app.include_router(bookings.router, prefix="/api/bookings", tags=["bookings"])
 app.include_router(marinas.router, prefix="/api/marinas", tags=["marinas"])
 app.include_router(partner_prices.router, prefix="/api/partner-prices", tags=["partner-prices"])
+app.include_router(search.router, prefix="/api", tags=["search"])
 
 @app.get("/")
 async def root():